@@ -193,7 +193,7 @@ async def create_contract_amendment(data: ContractAmendmentCreate):
         import uuid
 
         from app.models.contract import Contract, ContractAmendment
-        from app.models.enums import ContractChangeReason, ContractChangeType
+        from app.models.enums import AmendmentStatus, ContractChangeReason, ContractChangeType
 
         # 元契約を取得
         original_contract = await Contract.get_or_none(id=data.original_contract_id)
@@ -235,7 +235,7 @@ async def create_contract_amendment(data: ContractAmendmentCreate):
             new_unit_price=data.new_unit_price,
             new_contract_end_date=data.new_contract_end_date,
             new_working_hours=data.new_working_hours,
-            status="草案",
+            status=AmendmentStatus.DRAFT,
         )
 
         result = await amendment.to_dict()
@@ -251,6 +251,7 @@ async def approve_contract_amendment(data: ContractAmendmentApproval):
         from datetime import datetime
 
         from app.models.contract import ContractAmendment
+        from app.models.enums import AmendmentStatus
 
         # 修正書を取得
         amendment = await ContractAmendment.get_or_none(id=data.amendment_id)
@@ -276,7 +277,7 @@ async def approve_contract_amendment(data: ContractAmendmentApproval):
 
         # ステータス更新
         if amendment.all_parties_approved:
-            amendment.status = "承認済み"
+            amendment.status = AmendmentStatus.APPROVED
 
         await amendment.save()
 
@@ -302,7 +303,10 @@ async def get_contract_amendment(amendment_id: int):
 
 
 @router.get("/{contract_id}/amendments", summary="契約修正書一覧取得")
-async def get_contract_amendments(contract_id: int):
+async def get_contract_amendments(
+    contract_id: int,
+    fully_approved: Optional[bool] = Query(None, description="全当事者承認済みで絞り込み"),
+):
     """指定契約の修正書一覧を取得"""
     try:
         from app.models.contract import Contract, ContractAmendment
@@ -312,8 +316,11 @@ async def get_contract_amendments(contract_id: int):
         if not contract:
             return Fail(msg="契約が見つかりません")
 
-        # 修正書一覧を取得
-        amendments = await ContractAmendment.filter(original_contract=contract).order_by("-created_at")
+        # 修正書一覧を取得（承認状態は保存済みのフラグでDB側で絞り込み）
+        query = ContractAmendment.filter(original_contract=contract)
+        if fully_approved is not None:
+            query = query.filter(is_fully_approved=fully_approved)
+        amendments = await query.order_by("-created_at")
 
         data = []
         for amendment in amendments:
@@ -338,7 +345,7 @@ async def calculate_contract_payment(contract_id: int, actual_hours: float = Que
         # 精算計算を実行
         calculation_result = await contract.calculate_monthly_payment(actual_hours)
 
-        return Success(data=calculation_result)
+        return Success(data=calculation_result.to_dict())
     except Exception as e:
         return Fail(msg=str(e))
 
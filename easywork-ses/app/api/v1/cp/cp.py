@@ -1,7 +1,7 @@
 from typing import Optional
 
 from fastapi import APIRouter, Query
-from tortoise.exceptions import DoesNotExist
+from tortoise.exceptions import DoesNotExist, IntegrityError
 from tortoise.expressions import Q
 
 from app.controllers.cp import cp_controller
@@ -150,6 +150,8 @@ async def add_client_sales_rep(rep_data: AddClientSalesRepresentativeSchema):
         data["client_company_name"] = created_rep.client_company.company_name
 
         return Success(data=data)
+    except IntegrityError:
+        return Fail(msg="同じメールアドレスの営業担当者が既に登録されています")
     except Exception as e:
         return Fail(msg=str(e))
 
@@ -172,6 +174,8 @@ async def update_client_sales_rep(rep_data: UpdateClientSalesRepresentativeSchem
         return Success(data=data)
     except DoesNotExist:
         return Fail(msg="営業担当者が見つかりませんでした")
+    except IntegrityError:
+        return Fail(msg="同じメールアドレスの営業担当者が既に登録されています")
     except Exception as e:
         return Fail(msg=str(e))
 
@@ -292,6 +296,7 @@ async def get_client_contracts_list(
         data = []
         for contract in contracts:
             contract_dict = await contract.to_dict()
+            contract_dict["contract_documents"] = await contract.get_contract_documents()
             contract_dict["client_company_name"] = (
                 contract.client_company.company_name if contract.client_company else None
             )
@@ -308,6 +313,7 @@ async def get_client_contract(id: int = Query(..., description="契約ID")):
         contract = await cp_controller.get_contract_by_id(id)
         if contract:
             contract_dict = await contract.to_dict()
+            contract_dict["contract_documents"] = await contract.get_contract_documents()
             contract_dict["client_company_name"] = (
                 contract.client_company.company_name if contract.client_company else None
             )
@@ -323,6 +329,7 @@ async def add_client_contract(contract_data: AddClientCompanyContractSchema):
     try:
         contract = await cp_controller.add_client_contract(contract_data)
         contract_dict = await contract.to_dict()
+        contract_dict["contract_documents"] = await contract.get_contract_documents()
         return Success(data=contract_dict)
     except ValueError as e:
         return Fail(msg=str(e))
@@ -336,6 +343,7 @@ async def update_client_contract(contract_data: UpdateClientCompanyContractSchem
         contract = await cp_controller.update_client_contract(contract_data)
         if contract:
             contract_dict = await contract.to_dict()
+            contract_dict["contract_documents"] = await contract.get_contract_documents()
             return Success(data=contract_dict)
         else:
             return Fail(msg="契約が見つかりませんでした")
@@ -309,6 +309,7 @@ async def create_employee_evaluation(
     try:
         from tortoise.transactions import in_transaction
 
+        from app.models.enums import PersonType
         from app.models.evaluation import PersonEvaluation
 
         employee = await personnel_controller.get_employee_by_id(employee_id)
@@ -317,6 +318,7 @@ async def create_employee_evaluation(
 
         evaluation_data = data.model_dump(exclude_none=True) if data else {}
         evaluation_data["personnel_id"] = employee_id
+        evaluation_data["person_type"] = PersonType.EMPLOYEE
         evaluation_data["evaluator_id"] = evaluator_id
 
         async with in_transaction():
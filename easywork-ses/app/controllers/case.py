@@ -33,7 +33,8 @@ class CaseController:
         query = Case.filter(search)
         total = await query.count()
         cases = (
-            await query.select_related("client_company", "client_sales_representative", "company_sales_representative")
+            await Case.with_relations()
+            .filter(search)
             .order_by(*order)
             .limit(page_size)
             .offset((page - 1) * page_size)
@@ -71,9 +72,7 @@ class CaseController:
         return data, total
 
     async def get_case_by_id(self, case_id: int):
-        case = await Case.get_or_none(id=case_id).select_related(
-            "client_company", "client_sales_representative", "company_sales_representative"
-        )
+        case = await Case.with_relations().get_or_none(id=case_id)
         return case
 
     async def get_case_dict_by_id(self, case_id: int):
@@ -260,10 +259,11 @@ class CaseCandidateController:
         query = CaseCandidate.filter(search)
         total = await query.count()
         candidates = (
-            await query.order_by(*order)
+            await CaseCandidate.full_query()
+            .filter(search)
+            .order_by(*order)
             .limit(page_size)
             .offset((page - 1) * page_size)
-            .select_related("case", "bp_employee", "employee", "freelancer")
             .all()
         )
         return candidates, total
@@ -280,9 +280,7 @@ class CaseCandidateController:
         return data, total
 
     async def get_candidate_by_id(self, candidate_id: int):
-        candidate = await CaseCandidate.get_or_none(id=candidate_id).select_related(
-            "case", "bp_employee", "employee", "freelancer"
-        )
+        candidate = await CaseCandidate.full_query().get_or_none(id=candidate_id)
         return candidate
 
     async def get_candidate_dict_by_id(self, candidate_id: int):
@@ -390,7 +388,7 @@ class CaseCandidateController:
         return None
 
     async def delete_candidate(self, candidate_id: int):
-        candidate = await CaseCandidate.get_or_none(id=candidate_id)
+        candidate = await CaseCandidate.full_query().get_or_none(id=candidate_id)
         if candidate:
             candidate_data = await candidate.to_dict()
             candidate_data["candidate_name"] = candidate.candidate_name
@@ -442,28 +440,27 @@ class CaseHistoryController:
         comment: str = None,
         ip_address: str = None,
     ) -> List[CaseHistory]:
-        """変更内容から履歴を自動作成"""
-        histories = []
-
-        async with in_transaction():
-            for field, new_value in new_data.items():
-                if field in old_data:
-                    old_value = old_data[field]
-                    if old_value != new_value:
-                        history = await CaseHistory.create(
-                            case_id=case_id,
-                            change_type=ChangeType.UPDATE,
-                            changed_by=changed_by,
-                            changed_by_name=changed_by_name,
-                            field_name=field,
-                            old_value=str(old_value) if old_value is not None else None,
-                            new_value=str(new_value) if new_value is not None else None,
-                            comment=comment,
-                            ip_address=ip_address,
-                        )
-                        histories.append(history)
+        """変更内容から履歴を自動作成（変更フィールドごとの履歴を一括登録）"""
+        entries = []
+        for field, new_value in new_data.items():
+            if field in old_data:
+                old_value = old_data[field]
+                if old_value != new_value:
+                    entries.append(
+                        {
+                            "case_id": case_id,
+                            "change_type": ChangeType.UPDATE,
+                            "changed_by": changed_by,
+                            "changed_by_name": changed_by_name,
+                            "field_name": field,
+                            "old_value": str(old_value) if old_value is not None else None,
+                            "new_value": str(new_value) if new_value is not None else None,
+                            "comment": comment,
+                            "ip_address": ip_address,
+                        }
+                    )
 
-        return histories
+        return await CaseHistory.bulk_log(entries)
 
     async def create_simple_history(
         self,
@@ -95,7 +95,7 @@ class ContractController:
             )
 
     async def list_contracts(self, page: int = 1, page_size: int = 10, search: Q = Q(), orders: list = []):
-        query = Contract.filter(search).prefetch_related("case", "personnel")
+        query = Contract.filter(search).select_related("case", "personnel")
         total = await Contract.filter(search).count()
         contracts = await query.order_by(*orders).limit(page_size).offset((page - 1) * page_size).all()
         return contracts, total
@@ -157,7 +157,7 @@ class ContractController:
         return contract_dict
 
     async def get_contract(self, id):
-        contract = await Contract.get_or_none(id=id).prefetch_related("case", "personnel")
+        contract = await Contract.get_or_none(id=id).select_related("case", "personnel")
         return contract
 
     async def check_active_contract(self, **kwargs) -> bool:
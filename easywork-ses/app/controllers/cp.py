@@ -94,7 +94,7 @@ class CPCompanyController:
 
         total = await query.count()
         contracts = (
-            await query.prefetch_related("client_company")
+            await query.prefetch_related("client_company", "documents")
             .offset((page - 1) * page_size)
             .limit(page_size)
             .order_by(*orders)
@@ -103,7 +103,9 @@ class CPCompanyController:
 
     async def get_contract_by_id(self, contract_id: int):
         """契約取得"""
-        contract = await ClientCompanyContract.get_or_none(id=contract_id).prefetch_related("client_company")
+        contract = await ClientCompanyContract.get_or_none(id=contract_id).prefetch_related(
+            "client_company", "documents"
+        )
         return contract
 
     async def add_client_contract(self, contract_data: AddClientCompanyContractSchema):
@@ -115,18 +117,15 @@ class CPCompanyController:
 
         data = clean_dict(contract_data.model_dump(exclude_unset=True))
 
-        # contract_documentsの処理
-        if "contract_documents" in data and data["contract_documents"]:
-            # Pydantic modelをdictに変換
-            documents = []
-            for doc in data["contract_documents"]:
-                if hasattr(doc, "model_dump"):
-                    documents.append(doc.model_dump())
-                else:
-                    documents.append(doc)
-            data["contract_documents"] = documents
-
-        contract = await ClientCompanyContract.create(**data)
+        # contract_documentsは書類テーブルに保存
+        documents = [
+            doc.model_dump() if hasattr(doc, "model_dump") else doc for doc in data.pop("contract_documents", [])
+        ]
+
+        async with in_transaction():
+            contract = await ClientCompanyContract.create(**data)
+            if documents:
+                await contract.replace_contract_documents(documents)
         return contract
 
     async def update_client_contract(self, contract_data: UpdateClientCompanyContractSchema):
@@ -135,18 +134,16 @@ class CPCompanyController:
         if contract:
             dict_data = clean_dict(contract_data.model_dump(exclude_unset=True, exclude={"id"}))
 
-            # contract_documentsの処理
-            if "contract_documents" in dict_data and dict_data["contract_documents"] is not None:
-                documents = []
-                for doc in dict_data["contract_documents"]:
-                    if hasattr(doc, "model_dump"):
-                        documents.append(doc.model_dump())
-                    else:
-                        documents.append(doc)
-                dict_data["contract_documents"] = documents
-
-            contract.update_from_dict(dict_data)
-            await contract.save()
+            # contract_documentsは書類テーブルに保存（指定時は一覧を置き換え）
+            documents = dict_data.pop("contract_documents", None)
+
+            async with in_transaction():
+                contract.update_from_dict(dict_data)
+                await contract.save()
+                if documents is not None:
+                    await contract.replace_contract_documents(
+                        [doc.model_dump() if hasattr(doc, "model_dump") else doc for doc in documents]
+                    )
         return contract
 
     async def delete_client_contract(self, contract_id: int):
@@ -162,7 +159,7 @@ class CPCompanyController:
         """契約文書一覧取得"""
         contract = await ClientCompanyContract.get_or_none(id=contract_id)
         if contract:
-            return contract.get_contract_documents()
+            return await contract.get_contract_documents()
         return []
 
 
@@ -147,7 +147,7 @@ class DashboardController:
         # 有效契约的月收入统计
         active_contracts = await Contract.filter(
             status=ContractStatus.ACTIVE, contract_start_date__lte=today, contract_end_date__gte=today
-        ).prefetch_related("personnel", "calculation_items")
+        ).prefetch_related("personnel", Contract.active_items_prefetch())
 
         # 计算总月收入和按类型分组的收入
         total_monthly_revenue = 0
@@ -161,9 +161,10 @@ class DashboardController:
 
         for contract in active_contracts:
             # 计算合约月收入（基于基本给项目）
-            basic_salary_item = await contract.calculation_items.filter(
-                item_type=ContractItemType.BASIC_SALARY, is_active=True
-            ).first()
+            basic_salary_item = next(
+                (item for item in contract.calculation_items if item.item_type == ContractItemType.BASIC_SALARY),
+                None,
+            )
 
             monthly_revenue = 0
             if basic_salary_item:
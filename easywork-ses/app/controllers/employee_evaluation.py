@@ -54,8 +54,8 @@ class EmployeeEvaluationController:
 
         # データ取得
         evaluations = (
-            await PersonEvaluation.filter(query)
-            .prefetch_related("case", "contract")
+            await PersonEvaluation.with_related()
+            .filter(query)
             .order_by("-evaluation_date", "-created_at")
             .limit(page_size)
             .offset((page - 1) * page_size)
@@ -70,7 +70,7 @@ class EmployeeEvaluationController:
         """ID で評価取得"""
         query = PersonEvaluation.filter(id=evaluation_id, person_type=PersonType.EMPLOYEE)
         if include_relations:
-            query = query.prefetch_related("case", "contract")
+            query = PersonEvaluation.with_related().filter(id=evaluation_id, person_type=PersonType.EMPLOYEE)
         return await query.first()
 
     async def create_evaluation(self, evaluation_data: Dict[str, Any], evaluator_id: int) -> PersonEvaluation:
@@ -149,8 +149,8 @@ class EmployeeEvaluationController:
 
         total = await PersonEvaluation.filter(query).count()
         evaluations = (
-            await PersonEvaluation.filter(query)
-            .prefetch_related("case", "contract")
+            await PersonEvaluation.with_related()
+            .filter(query)
             .order_by("-evaluation_date", "-created_at")
             .limit(page_size)
             .offset((page - 1) * page_size)
@@ -300,6 +300,9 @@ class EmployeeEvaluationController:
         self, evaluations: List[PersonEvaluation], include_relations: bool = False
     ) -> List[Dict[str, Any]]:
         """評価リストを辞書形式に変換"""
+        if include_relations:
+            await PersonEvaluation.bulk_attach_persons(evaluations)
+
         result = []
         for evaluation in evaluations:
             eval_dict = await evaluation.to_dict()
@@ -309,7 +312,7 @@ class EmployeeEvaluationController:
 
             if include_relations:
                 # Personnel情報を追加
-                employee = await Personnel.get_or_none(id=evaluation.person_id)
+                employee = await evaluation.get_person_object()
                 if employee:
                     eval_dict["employee"] = await employee.to_dict()
 
@@ -3,6 +3,7 @@ from datetime import date, datetime, timedelta, time
 from typing import Any, Dict, List, Optional
 
 from tortoise.expressions import Q
+from tortoise.functions import Count, Sum
 
 from app.core.ctx import CTX_USER_ID, CTX_USER_INFO
 from app.core.process_client import process_client
@@ -41,6 +42,9 @@ from app.schemas.finance import (
 )
 from app.utils.common import clean_dict
 
+# 変更時に予算の使用済み金額・残予算・使用率の再計算が必要な項目
+_BUDGET_RECALC_FIELDS = frozenset(("category", "period_start", "period_end", "budget_amount"))
+
 
 class FinanceController:
     def __init__(self):
@@ -58,6 +62,15 @@ class FinanceController:
         now = datetime.now()
         return f"TXN-{now.strftime('%Y%m%d%H%M%S')}-{now.microsecond // 1000:03d}"
 
+    async def _count_and_sum_amount(self, filters: Q) -> tuple[int, float]:
+        """条件に一致する取引の件数と金額合計をDB側で集計（取引の行は取得しない）"""
+        result = await FinanceTransaction.filter(filters).annotate(
+            count=Count("id"), total=Sum("amount")
+        ).first().values("count", "total")
+        if not result:
+            return 0, 0.0
+        return result["count"] or 0, result["total"] or 0.0
+
     # ==================== 財務取引管理 ====================
 
     async def create_transaction(self, data: FinanceTransactionCreate) -> Dict[str, Any]:
@@ -68,12 +81,7 @@ class FinanceController:
         transaction_data["transaction_number"] = self._generate_transaction_number()
         transaction_data["requested_by"] = user_name
 
-        # 税額を計算
-        if transaction_data.get("tax_rate", 0) > 0:
-            tax_amount = transaction_data["amount"] * (transaction_data["tax_rate"] / 100)
-            transaction_data["tax_amount"] = tax_amount
-            transaction_data["tax_exclusive_amount"] = transaction_data["amount"] - tax_amount
-
+        # 税額・税抜金額は保存時に計算される
         transaction = await FinanceTransaction.create(**transaction_data)
 
         return {
@@ -121,9 +129,7 @@ class FinanceController:
         total = await FinanceTransaction.filter(filters).count()
 
         # データ取得
-        transactions = await FinanceTransaction.filter(filters).select_related(
-            "case", "contract", "personnel", "recurrence_rule"
-        ).order_by("-created_at").offset(
+        transactions = await FinanceTransaction.with_related().filter(filters).order_by("-created_at").offset(
             (query.page - 1) * query.page_size
         ).limit(query.page_size).all()
 
@@ -166,39 +172,25 @@ class FinanceController:
 
         # 各状态统计
         # 保留中状态
-        pending_count = await FinanceTransaction.filter(base_filters & Q(status=FinanceStatus.PENDING)).count()
-        pending_transactions = await FinanceTransaction.filter(base_filters & Q(status=FinanceStatus.PENDING)).all()
-        pending_amount = sum(txn.amount for txn in pending_transactions)
+        pending_count, pending_amount = await self._count_and_sum_amount(base_filters & Q(status=FinanceStatus.PENDING))
 
         # 処理中状态
-        processing_count = await FinanceTransaction.filter(base_filters & Q(status=FinanceStatus.PROCESSING)).count()
-        processing_transactions = await FinanceTransaction.filter(base_filters & Q(status=FinanceStatus.PROCESSING)).all()
-        processing_amount = sum(txn.amount for txn in processing_transactions)
+        processing_count, processing_amount = await self._count_and_sum_amount(base_filters & Q(status=FinanceStatus.PROCESSING))
 
         # 完了状态
-        completed_count = await FinanceTransaction.filter(base_filters & Q(status=FinanceStatus.COMPLETED)).count()
-        completed_transactions = await FinanceTransaction.filter(base_filters & Q(status=FinanceStatus.COMPLETED)).all()
-        completed_amount = sum(txn.amount for txn in completed_transactions)
+        completed_count, completed_amount = await self._count_and_sum_amount(base_filters & Q(status=FinanceStatus.COMPLETED))
 
         # キャンセル状态
-        cancelled_count = await FinanceTransaction.filter(base_filters & Q(status=FinanceStatus.CANCELLED)).count()
-        cancelled_transactions = await FinanceTransaction.filter(base_filters & Q(status=FinanceStatus.CANCELLED)).all()
-        cancelled_amount = sum(txn.amount for txn in cancelled_transactions)
+        cancelled_count, cancelled_amount = await self._count_and_sum_amount(base_filters & Q(status=FinanceStatus.CANCELLED))
 
         # 承認待ち状态
-        approval_pending_count = await FinanceTransaction.filter(base_filters & Q(approval_status=FinanceApprovalStatus.PENDING)).count()
-        approval_pending_transactions = await FinanceTransaction.filter(base_filters & Q(approval_status=FinanceApprovalStatus.PENDING)).all()
-        approval_pending_amount = sum(txn.amount for txn in approval_pending_transactions)
+        approval_pending_count, approval_pending_amount = await self._count_and_sum_amount(base_filters & Q(approval_status=FinanceApprovalStatus.PENDING))
 
         # 承認済み状态
-        approved_count = await FinanceTransaction.filter(base_filters & Q(approval_status=FinanceApprovalStatus.APPROVED)).count()
-        approved_transactions = await FinanceTransaction.filter(base_filters & Q(approval_status=FinanceApprovalStatus.APPROVED)).all()
-        approved_amount = sum(txn.amount for txn in approved_transactions)
+        approved_count, approved_amount = await self._count_and_sum_amount(base_filters & Q(approval_status=FinanceApprovalStatus.APPROVED))
 
         # 却下状态（单独统计，不计入見込み）
-        rejected_count = await FinanceTransaction.filter(base_filters & Q(approval_status=FinanceApprovalStatus.REJECTED)).count()
-        rejected_transactions = await FinanceTransaction.filter(base_filters & Q(approval_status=FinanceApprovalStatus.REJECTED)).all()
-        rejected_amount = sum(txn.amount for txn in rejected_transactions)
+        rejected_count, rejected_amount = await self._count_and_sum_amount(base_filters & Q(approval_status=FinanceApprovalStatus.REJECTED))
 
         # 見込み总计（排除取消和拒绝的）
         pending_total_count = pending_count + processing_count + approval_pending_count + approved_count
@@ -258,9 +250,7 @@ class FinanceController:
 
     async def get_transaction_detail(self, transaction_id: int) -> Dict[str, Any]:
         """財務取引詳細を取得"""
-        transaction = await FinanceTransaction.filter(id=transaction_id).select_related(
-            "case", "contract", "personnel", "recurrence_rule"
-        ).first()
+        transaction = await FinanceTransaction.with_related().filter(id=transaction_id).first()
 
         if not transaction:
             raise ValueError("指定された取引が見つかりません")
@@ -284,15 +274,7 @@ class FinanceController:
 
         update_data = clean_dict(data.dict(exclude_unset=True))
 
-        # 税額再計算
-        if "tax_rate" in update_data or "amount" in update_data:
-            amount = update_data.get("amount", transaction.amount)
-            tax_rate = update_data.get("tax_rate", transaction.tax_rate)
-            if tax_rate > 0:
-                tax_amount = amount * (tax_rate / 100)
-                update_data["tax_amount"] = tax_amount
-                update_data["tax_exclusive_amount"] = amount - tax_amount
-
+        # 税額・税抜金額は保存時に再計算される
         await transaction.update_from_dict(update_data)
         await transaction.save()
 
@@ -386,16 +368,13 @@ class FinanceController:
 
     async def execute_recurrence_rules(self) -> Dict[str, Any]:
         """定期取引ルールを実行"""
-        executed_count = 0
-        created_transactions = []
-
         rules = await FinanceRecurrenceRule.filter(is_active=True).all()
+        executable_rules = [rule for rule in rules if await rule.should_execute_today()]
 
-        for rule in rules:
-            if await rule.should_execute_today():
-                transaction = await rule.create_transaction()
-                created_transactions.append(await transaction.to_dict())
-                executed_count += 1
+        # 実行対象の取引をまとめて作成
+        transactions = await FinanceRecurrenceRule.bulk_execute(executable_rules)
+        created_transactions = [await transaction.to_dict() for transaction in transactions]
+        executed_count = len(transactions)
 
         return {
             "executed_count": executed_count,
@@ -408,9 +387,10 @@ class FinanceController:
     async def create_budget(self, data: FinanceBudgetCreate) -> Dict[str, Any]:
         """予算を作成"""
         budget_data = data.dict()
-        budget_data["remaining_amount"] = budget_data["budget_amount"]
 
         budget = await FinanceBudget.create(**budget_data)
+        # 作成前に計上済みの取引を使用済み金額に反映
+        await budget.update_spent_amount()
 
         return {
             "budget": await budget.to_dict(),
@@ -430,7 +410,7 @@ class FinanceController:
 
         budget_list = []
         for budget in budgets:
-            await budget.update_spent_amount()  # 最新の使用額で更新
+            # 使用済み金額は取引保存時に差分で更新済みのため再計算しない
             budget_dict = await budget.to_dict()
             budget_dict["usage_percentage"] = budget.usage_percentage
             budget_dict["is_over_warning"] = budget.is_over_warning
@@ -453,12 +433,15 @@ class FinanceController:
 
         update_data = clean_dict(data.dict(exclude_unset=True))
 
-        # 予算金額が変更された場合、残予算も更新
-        if "budget_amount" in update_data:
-            update_data["remaining_amount"] = update_data["budget_amount"] - budget.spent_amount
-
+        # 使用済み金額は取引保存時に差分で更新されるため、読み込んだ値で上書きしないよう変更項目のみ保存
         await budget.update_from_dict(update_data)
-        await budget.save()
+        await budget.save(update_fields=[*update_data, "updated_at"])
+
+        if _BUDGET_RECALC_FIELDS.isdisjoint(update_data):
+            await budget.refresh_from_db()
+        else:
+            # 集計対象・予算金額の変更時は使用済み金額・残予算・使用率を再計算
+            await budget.update_spent_amount()
 
         return {
             "budget": await budget.to_dict(),
@@ -529,17 +512,16 @@ class FinanceController:
             current_date = month_end + timedelta(days=1)
 
         # 予算分析
-        budgets = await FinanceBudget.filter(
-            period_start__lte=query.period_end,
-            period_end__gte=query.period_start,
-            is_active=True
-        ).all()
+        budget_filters = Q(period_start__lte=query.period_end, period_end__gte=query.period_start)
+        budget_totals = await FinanceBudget.filter(budget_filters, is_active=True).annotate(
+            total_budget=Sum("budget_amount"), total_spent=Sum("spent_amount")
+        ).first().values("total_budget", "total_spent")
 
         budget_analysis = {
-            "total_budget": sum(b.budget_amount for b in budgets),
-            "total_spent": sum(b.spent_amount for b in budgets),
-            "over_budget_count": len([b for b in budgets if b.is_over_alert]),
-            "warning_count": len([b for b in budgets if b.is_over_warning])
+            "total_budget": (budget_totals or {}).get("total_budget") or 0.0,
+            "total_spent": (budget_totals or {}).get("total_spent") or 0.0,
+            "over_budget_count": await FinanceBudget.over_alert().filter(budget_filters).count(),
+            "warning_count": await FinanceBudget.over_warning().filter(budget_filters).count()
         }
 
         return {
@@ -580,12 +562,7 @@ class FinanceController:
         ).count()
 
         # 予算アラート
-        alert_budgets = await FinanceBudget.filter(is_active=True).all()
-        over_budget_count = 0
-        for budget in alert_budgets:
-            await budget.update_spent_amount()
-            if budget.is_over_alert:
-                over_budget_count += 1
+        over_budget_count = await FinanceBudget.over_alert().count()
 
         # 今日実行予定の定期取引
         recurring_rules = await FinanceRecurrenceRule.filter(is_active=True).all()
@@ -1054,10 +1031,7 @@ class FinanceController:
         application_data["applicant_name"] = user_info.get("name", "")
         application_data["department"] = user_info.get("department", "")
 
-        # 申請番号を自動生成
-        timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
-        application_data["application_number"] = f"EXP{timestamp}{user_id:04d}"
-
+        # 申請番号は保存時に自動生成される
         application = await ExpenseApplication.create(**application_data)
 
         # 工作流を自動開始（tokenが提供された場合）
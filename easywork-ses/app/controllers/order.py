@@ -178,15 +178,11 @@ class OrderController:
         total = await query.count()
 
         offset = (page - 1) * pageSize
-        orders = (
-            await query.offset(offset)
-            .limit(pageSize)
-            .prefetch_related(
-                "personnel__bp_employee_detail__bp_company",
-                "case__company_sales_representative",
-                "contract__calculation_items",
-            )
-        )
+        orders = await query.offset(offset).limit(pageSize).select_related("personnel", "case", "contract")
+        # スナップショット未保存の注文書のみ関連データをまとめて取得
+        without_snapshot = [order for order in orders if not order.has_snapshot]
+        if without_snapshot:
+            await Order.fetch_for_list(without_snapshot, *Order.DETAIL_RELATIONS)
 
         # 詳細情報を含むリストを構築
         items = []
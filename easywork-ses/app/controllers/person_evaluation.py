@@ -33,8 +33,8 @@ class PersonEvaluationController:
 
         # データ取得
         evaluations = (
-            await PersonEvaluation.filter(query)
-            .prefetch_related("case", "contract")
+            await PersonEvaluation.with_related()
+            .filter(query)
             .order_by("-evaluation_date", "-created_at")
             .limit(page_size)
             .offset((page - 1) * page_size)
@@ -49,7 +49,7 @@ class PersonEvaluationController:
         """IDで評価取得"""
         query = PersonEvaluation.filter(id=evaluation_id)
         if include_relations:
-            query = query.prefetch_related("case", "contract")
+            query = PersonEvaluation.with_related().filter(id=evaluation_id)
         return await query.first()
 
     async def create_evaluation(self, evaluation_data) -> PersonEvaluation:
@@ -131,9 +131,7 @@ class PersonEvaluationController:
         page_size: int = 10,
     ) -> Tuple[List[PersonEvaluation], int]:
         """特定人材の評価一覧取得"""
-        query = PersonEvaluation.filter(person_type=person_type, person_id=person_id).prefetch_related(
-            "case", "contract"
-        )
+        query = PersonEvaluation.with_related().filter(person_type=person_type, person_id=person_id)
 
         total = await query.count()
         evaluations = (
@@ -232,6 +230,11 @@ class PersonEvaluationController:
                 }
             person_stats[key]["evaluations"].append(evaluation)
 
+        # 最小評価数を満たす人材の評価に対象人材をまとめて設定
+        await PersonEvaluation.bulk_attach_persons(
+            [stats["evaluations"][0] for stats in person_stats.values() if len(stats["evaluations"]) >= min_evaluations]
+        )
+
         # 最小評価数を満たす人材をフィルタリングし、評価計算
         top_persons = []
         for (person_type, person_id), stats in person_stats.items():
@@ -241,8 +244,7 @@ class PersonEvaluationController:
                 recommendation_rate = sum(1 for e in evaluations if e.recommendation) / len(evaluations) * 100
 
                 # 人材名を取得
-                person = await self._get_person_by_type_and_id(person_type, person_id)
-                person_name = person.name if person else f"Unknown-{person_id}"
+                person_name = await evaluations[0].get_person_name()
 
                 top_persons.append(
                     {
@@ -312,13 +314,16 @@ class PersonEvaluationController:
         self, evaluations: List[PersonEvaluation], include_relations: bool = False
     ) -> List[Dict[str, Any]]:
         """評価リスト辞書変換"""
+        if include_relations:
+            await PersonEvaluation.bulk_attach_persons(evaluations)
+
         result = []
         for evaluation in evaluations:
             evaluation_dict = await evaluation.to_dict()
 
             if include_relations:
                 # 人材名を取得
-                person = await self._get_person_by_type_and_id(evaluation.person_type, evaluation.person_id)
+                person = await evaluation.get_person_object()
                 if person:
                     evaluation_dict["person_name"] = person.name
 
@@ -21,7 +21,12 @@ from app.core.exceptions import (
 from app.log import logger
 from app.settings.config import settings
 
-from .middlewares import BackGroundTaskMiddleware, HttpAuditLogMiddleware
+from .middlewares import (
+    BackGroundTaskMiddleware,
+    HttpAuditLogMiddleware,
+    PersonnelCacheMiddleware,
+    TodayCacheMiddleware,
+)
 
 
 def make_middlewares():
@@ -34,6 +39,8 @@ def make_middlewares():
             allow_headers=settings.CORS_ALLOW_HEADERS,
         ),
         Middleware(BackGroundTaskMiddleware),
+        Middleware(TodayCacheMiddleware),
+        Middleware(PersonnelCacheMiddleware),
         Middleware(
             HttpAuditLogMiddleware,
             methods=["GET", "POST", "PUT", "DELETE"],
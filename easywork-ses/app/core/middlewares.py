@@ -1,5 +1,5 @@
 import re
-from datetime import datetime
+from datetime import date, datetime
 
 from fastapi import FastAPI
 from fastapi.responses import Response
@@ -9,6 +9,7 @@ from starlette.requests import Request
 from starlette.types import ASGIApp, Receive, Scope, Send
 
 from .bgtask import BgTasks
+from .ctx import CTX_PERSONNEL_CACHE, CTX_TODAY
 
 
 class SimpleBaseMiddleware:
@@ -41,6 +42,18 @@ class BackGroundTaskMiddleware(SimpleBaseMiddleware):
         await BgTasks.execute_tasks()
 
 
+class TodayCacheMiddleware(SimpleBaseMiddleware):
+    async def before_request(self, request):
+        # リクエスト内でdate.today()を使い回すため、開始時に一度だけ取得する
+        CTX_TODAY.set(date.today())
+
+
+class PersonnelCacheMiddleware(SimpleBaseMiddleware):
+    async def before_request(self, request):
+        # リクエスト内で (人材タイプ, 人材ID) ごとの人材取得結果を使い回すためのキャッシュ
+        CTX_PERSONNEL_CACHE.set({})
+
+
 class HttpAuditLogMiddleware(BaseHTTPMiddleware):
     def __init__(self, app, methods: list, exclude_paths: list):
         super().__init__(app)
@@ -0,0 +1,137 @@
+"""
+契約精算の数値計算カーネル
+
+numba がインストールされている環境では compute_payment をJITコンパイルし、
+未インストールの場合は上限・下限時間の有無ごとに分岐を展開した純Python関数を生成して使用する。
+上限・下限時間の未設定は 0 以下（-1.0）で渡す。
+"""
+
+import numpy as np
+
+try:
+    from numba import njit, prange
+
+    HAS_NUMBA = True
+except ImportError:  # numba は任意依存
+    HAS_NUMBA = False
+    prange = range
+
+    def njit(*args, **kwargs):
+        def decorator(func):
+            return func
+
+        return decorator
+
+
+@njit(cache=True)
+def compute_payment(base_salary, std_h, max_h, min_h, free_ot, ot_rate, short_rate, actual):
+    """1契約分の残業代・欠勤控除を計算
+
+    Returns:
+        (時間単価, 残業時間, 残業代, 不足時間, 欠勤控除)
+    """
+    hourly = base_salary / std_h
+    overtime_hours = 0.0
+    overtime = 0.0
+    shortage_hours = 0.0
+    shortage = 0.0
+    if max_h > 0 and actual > max_h:
+        overtime_hours = actual - max_h - free_ot
+        if overtime_hours > 0:
+            overtime = overtime_hours * hourly * ot_rate
+        else:
+            overtime_hours = 0.0
+    if min_h > 0 and actual < min_h:
+        shortage_hours = min_h - actual
+        shortage = shortage_hours * hourly * short_rate
+    return hourly, overtime_hours, overtime, shortage_hours, shortage
+
+
+# (上限時間あり, 下限時間あり) -> 生成済みカーネル
+_payment_kernels = {}
+
+
+def _build_payment_kernel(has_max: bool, has_min: bool):
+    """
+    上限・下限時間の有無に特化したcompute_paymentを生成する
+    契約ごとに不要な分岐を除いた関数をexecでコンパイルする
+    """
+    lines = [
+        "def _payment_kernel(base_salary, std_h, max_h, min_h, free_ot, ot_rate, short_rate, actual):",
+        "    hourly = base_salary / std_h",
+    ]
+    if has_max:
+        lines += [
+            "    overtime_hours = actual - max_h - free_ot",
+            "    if actual > max_h and overtime_hours > 0:",
+            "        overtime = overtime_hours * hourly * ot_rate",
+            "    else:",
+            "        overtime_hours = overtime = 0.0",
+        ]
+    else:
+        lines.append("    overtime_hours = overtime = 0.0")
+    if has_min:
+        lines += [
+            "    if actual < min_h:",
+            "        shortage_hours = min_h - actual",
+            "        shortage = shortage_hours * hourly * short_rate",
+            "    else:",
+            "        shortage_hours = shortage = 0.0",
+        ]
+    else:
+        lines.append("    shortage_hours = shortage = 0.0")
+    lines.append("    return hourly, overtime_hours, overtime, shortage_hours, shortage")
+
+    namespace = {}
+    exec("\n".join(lines) + "\n", namespace)
+    return namespace["_payment_kernel"]
+
+
+def payment_kernel(max_h: float, min_h: float):
+    """契約の上限・下限時間に応じた残業代・欠勤控除の計算関数を返す（引数はcompute_paymentと同じ）"""
+    if HAS_NUMBA:
+        return compute_payment
+    key = (max_h > 0, min_h > 0)
+    kernel = _payment_kernels.get(key)
+    if kernel is None:
+        kernel = _payment_kernels[key] = _build_payment_kernel(*key)
+    return kernel
+
+
+def compute_payments_vec(base_salary, std_h, max_h, min_h, free_ot, ot_rate, short_rate, actual):
+    """compute_payment の配列版（契約単位の配列で一括計算、上限・下限の未設定はNaN）"""
+    hourly = base_salary / std_h
+    overtime_hours = np.maximum(actual - np.where(np.isnan(max_h), np.inf, max_h) - free_ot, 0.0)
+    shortage_hours = np.maximum(np.where(np.isnan(min_h), -np.inf, min_h) - actual, 0.0)
+    return (
+        hourly,
+        overtime_hours,
+        overtime_hours * hourly * ot_rate,
+        shortage_hours,
+        shortage_hours * hourly * short_rate,
+    )
+
+
+@njit(cache=True, parallel=True)
+def _compute_payments_parallel(base_salary, std_h, max_h, min_h, free_ot, ot_rate, short_rate, actual):
+    """compute_payment を契約ごとに並列実行（numba環境用、上限・下限の未設定はNaN）"""
+    n = base_salary.shape[0]
+    hourly = np.empty(n)
+    overtime_hours = np.empty(n)
+    overtime = np.empty(n)
+    shortage_hours = np.empty(n)
+    shortage = np.empty(n)
+    for i in prange(n):
+        h, oh, o, sh, s = compute_payment(
+            base_salary[i], std_h[i], max_h[i], min_h[i], free_ot[i], ot_rate[i], short_rate[i], actual[i]
+        )
+        hourly[i] = h
+        overtime_hours[i] = oh
+        overtime[i] = o
+        shortage_hours[i] = sh
+        shortage[i] = s
+    return hourly, overtime_hours, overtime, shortage_hours, shortage
+
+
+# 一括計算の実装（numba環境ではJIT並列ループ、それ以外はNumPyのベクトル演算）
+compute_payments_batch = _compute_payments_parallel if HAS_NUMBA else compute_payments_vec
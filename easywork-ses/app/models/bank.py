@@ -1,3 +1,5 @@
+from typing import ClassVar
+
 from tortoise import fields
 
 from app.models.base import BaseModel, TimestampMixin
@@ -59,7 +61,8 @@ class BankAccount(BaseModel, TimestampMixin):
     is_default = fields.BooleanField(default=False, description="デフォルト口座")
     is_active = fields.BooleanField(default=True, description="有効フラグ")
 
-    # 写し
+    # 写し（URL文字列のリスト）
+    # MySQLには配列型がないためJSONFieldのまま。読み込み時に一度だけデコードされ、to_dictはデコード済みのlistを返す
     copy_url = fields.JSONField(null=True, description="口座写しURL")
 
     remark = fields.TextField(null=True, description="備考")
@@ -72,8 +75,24 @@ class BankAccount(BaseModel, TimestampMixin):
             ("bank", "branch"),
         ]
 
+    # __str__で名称表示に使用する関連（select_relatedでまとめて取得）
+    REPR_RELATIONS: ClassVar[tuple[str, ...]] = ("bank", "branch", "bp_company")
+
     def __str__(self):
-        return f"{self.bank.name} {self.branch.name} {self.account_number} ({self.bp_company.name})"
+        # 未取得の関連は遅延取得せずIDで表示する
+        bank = self._loaded_relation("bank")
+        branch = self._loaded_relation("branch")
+        bp_company = self._loaded_relation("bp_company")
+        bank_label = bank.name if bank else f"bank#{self.bank_id}"
+        branch_label = branch.name if branch else f"branch#{self.branch_id}"
+        company_label = bp_company.name if bp_company else f"bp#{self.bp_company_id}"
+        return f"{bank_label} {branch_label} {self.account_number} ({company_label})"
+
+    @classmethod
+    async def repr_with_relations(cls, instance: "BankAccount") -> str:
+        """関連を1クエリで取得した上で表示文字列を生成"""
+        loaded = await cls.filter(id=instance.id).select_related(*cls.REPR_RELATIONS).first()
+        return str(loaded or instance)
 
 
 class ClientBankAccount(BaseModel, TimestampMixin):
@@ -96,7 +115,8 @@ class ClientBankAccount(BaseModel, TimestampMixin):
     is_default = fields.BooleanField(default=False, description="デフォルト口座")
     is_active = fields.BooleanField(default=True, description="有効フラグ")
 
-    # 写し
+    # 写し（URL文字列のリスト）
+    # MySQLには配列型がないためJSONFieldのまま。読み込み時に一度だけデコードされ、to_dictはデコード済みのlistを返す
     copy_url = fields.JSONField(null=True, description="口座写しURL")
 
     remark = fields.TextField(null=True, description="備考")
@@ -109,5 +129,21 @@ class ClientBankAccount(BaseModel, TimestampMixin):
             ("bank", "branch"),
         ]
 
+    # __str__で名称表示に使用する関連（select_relatedでまとめて取得）
+    REPR_RELATIONS: ClassVar[tuple[str, ...]] = ("bank", "branch", "client_company")
+
     def __str__(self):
-        return f"{self.bank.name} {self.branch.name} {self.account_number} ({self.client_company.company_name})"
+        # 未取得の関連は遅延取得せずIDで表示する
+        bank = self._loaded_relation("bank")
+        branch = self._loaded_relation("branch")
+        client_company = self._loaded_relation("client_company")
+        bank_label = bank.name if bank else f"bank#{self.bank_id}"
+        branch_label = branch.name if branch else f"branch#{self.branch_id}"
+        company_label = client_company.company_name if client_company else f"client#{self.client_company_id}"
+        return f"{bank_label} {branch_label} {self.account_number} ({company_label})"
+
+    @classmethod
+    async def repr_with_relations(cls, instance: "ClientBankAccount") -> str:
+        """関連を1クエリで取得した上で表示文字列を生成"""
+        loaded = await cls.filter(id=instance.id).select_related(*cls.REPR_RELATIONS).first()
+        return str(loaded or instance)
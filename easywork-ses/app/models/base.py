@@ -1,40 +1,147 @@
 import asyncio
 import decimal
+import keyword
+from collections.abc import Iterable
 from datetime import date, datetime, time, timedelta
+from typing import ClassVar
 
 from tortoise import fields, models
 
+from app.core.ctx import CTX_TODAY
 from app.settings import settings
 
 
+def today_cached() -> date:
+    """
+    リクエスト内でキャッシュされた本日日付を返す
+    TodayCacheMiddleware外（スクリプト等）では日付跨ぎを避けるため都度date.today()を返す
+    """
+    today = CTX_TODAY.get()
+    return today if today is not None else date.today()
+
+
+def _convert_value(v):
+    """to_dict用の値変換（日時はフォーマット済み文字列、Decimalはfloat）"""
+    if isinstance(v, datetime):
+        return v.strftime(settings.DATETIME_FORMAT)
+    elif isinstance(v, date):
+        return v.isoformat()
+    elif isinstance(v, time):
+        return v.strftime("%H:%M:%S")
+    elif isinstance(v, timedelta):
+        return str(v)  # 或者 int(v.total_seconds())
+    elif isinstance(v, decimal.Decimal):
+        return float(v)
+    return v
+
+
+# 値変換が必要なフィールド型（それ以外はそのまま出力する）
+_CONVERTED_FIELD_TYPES = (
+    fields.DatetimeField,
+    fields.DateField,
+    fields.TimeField,
+    fields.TimeDeltaField,
+    fields.DecimalField,
+)
+
+
+def _build_to_dict_gen(model_cls):
+    """
+    モデルクラス専用のto_dict関数を生成する
+    フィールドごとの分岐・ループを展開した単一のdictリテラルを返す関数をexecでコンパイルする
+    """
+    meta = model_cls._meta
+    column_fields = {
+        meta.fields_db_projection[name]: field
+        for name, field in meta.fields_map.items()
+        if name in meta.fields_db_projection
+    }
+
+    items = []
+    for column in meta.db_fields:
+        if not column.isidentifier() or keyword.iskeyword(column):
+            return None
+        field = column_fields.get(column)
+        if field is None or isinstance(field, _CONVERTED_FIELD_TYPES):
+            items.append(f"{column!r}: _convert_value(self.{column})")
+        else:
+            items.append(f"{column!r}: self.{column}")
+
+    source = "def _to_dict_gen(self):\n    return {" + ", ".join(items) + "}\n"
+    namespace = {"_convert_value": _convert_value}
+    exec(source, namespace)
+    return namespace["_to_dict_gen"]
+
+
 class BaseModel(models.Model):
     id = fields.BigIntField(pk=True, index=True)
 
+    def _loaded_relation(self, field: str):
+        """取得済みの関連オブジェクトを返す（未取得の場合はNone、遅延取得は行わない）"""
+        return getattr(self, f"_{field}", None)
+
+    # DB上の値を保持して変更有無を判定するフィールド（シグナルで変更のない保存時のクエリを省くため）
+    TRACKED_FIELDS: ClassVar[tuple[str, ...]] = ()
+
+    @classmethod
+    def _init_from_db(cls, **kwargs):
+        instance = super()._init_from_db(**kwargs)
+        if cls.TRACKED_FIELDS:
+            instance._remember_saved_values(cls.TRACKED_FIELDS)
+        return instance
+
+    def _remember_saved_values(self, field_names: Iterable[str]):
+        """指定フィールドの現在値をDB上の値として記録"""
+        saved_values = self.__dict__.setdefault("_saved_values", {})
+        for field in field_names:
+            saved_values[field] = getattr(self, field, None)
+
+    def tracked_field_changed(self, field: str) -> bool:
+        """DB上の値から変更されているか（未保存・値が未記録の場合は変更ありとみなす）"""
+        saved_values = self.__dict__.get("_saved_values")
+        if saved_values is None or field not in saved_values:
+            return True
+        return saved_values[field] != getattr(self, field, None)
+
+    async def save(self, *args, update_fields: Iterable[str] | None = None, **kwargs):
+        if not self.TRACKED_FIELDS:
+            return await super().save(*args, update_fields=update_fields, **kwargs)
+        if update_fields is not None:
+            update_fields = tuple(update_fields)
+        await super().save(*args, update_fields=update_fields, **kwargs)
+        saved = self.TRACKED_FIELDS if update_fields is None else set(self.TRACKED_FIELDS).intersection(update_fields)
+        self._remember_saved_values(saved)
+
+    async def refresh_from_db(self, fields: Iterable[str] | None = None, using_db=None):
+        await super().refresh_from_db(fields=fields, using_db=using_db)
+        if self.TRACKED_FIELDS:
+            refreshed = self.TRACKED_FIELDS if fields is None else set(self.TRACKED_FIELDS).intersection(fields)
+            self._remember_saved_values(refreshed)
+
+    @classmethod
+    def _get_to_dict_gen(cls):
+        # _metaはTortoise初期化後に確定するため、初回呼び出し時にクラスごとに生成してキャッシュする
+        if "_to_dict_gen_cache" not in cls.__dict__:
+            cls._to_dict_gen_cache = _build_to_dict_gen(cls)
+        return cls._to_dict_gen_cache
+
     async def to_dict(self, m2m: bool = False, exclude_fields: list[str] | None = None):
-        if exclude_fields is None:
-            exclude_fields = []
-
-        d = {}
-        for field in self._meta.db_fields:
-            if field not in exclude_fields:
-                value = getattr(self, field)
-                if isinstance(value, datetime):
-                    value = value.strftime(settings.DATETIME_FORMAT)
-                elif isinstance(value, date):
-                    value = value.isoformat()
-                elif isinstance(value, time):
-                    value = value.strftime("%H:%M:%S")
-                elif isinstance(value, timedelta):
-                    value = str(value)  # 或者 int(value.total_seconds())
-                elif isinstance(value, decimal.Decimal):
-                    value = float(value)
-                d[field] = value
+        exclude_set = frozenset(exclude_fields) if exclude_fields else frozenset()
+
+        to_dict_gen = None if exclude_set else self._get_to_dict_gen()
+        if to_dict_gen is not None:
+            d = to_dict_gen(self)
+        else:
+            d = {}
+            for field in self._meta.db_fields:
+                if field not in exclude_set:
+                    d[field] = _convert_value(getattr(self, field))
 
         if m2m:
             tasks = [
-                self.__fetch_m2m_field(field, exclude_fields)
+                self.__fetch_m2m_field(field, exclude_set)
                 for field in self._meta.m2m_fields
-                if field not in exclude_fields
+                if field not in exclude_set
             ]
             results = await asyncio.gather(*tasks)
             for field, values in results:
@@ -42,27 +149,11 @@ class BaseModel(models.Model):
 
         return d
 
-    async def __fetch_m2m_field(self, field, exclude_fields):
+    async def __fetch_m2m_field(self, field, exclude_set: frozenset):
         values = await getattr(self, field).all().values()
-        formatted_values = []
-
-        for value in values:
-            formatted_value = {}
-            for k, v in value.items():
-                if k not in exclude_fields:
-                    if isinstance(v, datetime):
-                        formatted_value[k] = v.strftime(settings.DATETIME_FORMAT)
-                    elif isinstance(v, date):
-                        formatted_value[k] = v.isoformat()
-                    elif isinstance(v, time):
-                        formatted_value[k] = v.strftime("%H:%M:%S")
-                    elif isinstance(v, timedelta):
-                        formatted_value[k] = str(v)
-                    elif isinstance(v, decimal.Decimal):
-                        formatted_value[k] = float(v)
-                    else:
-                        formatted_value[k] = v
-            formatted_values.append(formatted_value)
+        formatted_values = [
+            {k: _convert_value(v) for k, v in value.items() if k not in exclude_set} for value in values
+        ]
 
         return field, formatted_values
 
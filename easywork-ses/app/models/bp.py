@@ -1,6 +1,8 @@
+from datetime import date, datetime, timedelta
+
 from tortoise import fields
 
-from app.models.base import BaseModel, TimestampMixin
+from app.models.base import BaseModel, TimestampMixin, today_cached
 from app.models.enums import (
     AttendanceCalcType,
     BPCompanyStatus,
@@ -153,6 +155,7 @@ class BPEmployee(BaseModel, TimestampMixin):
             ("nationality", "visa_status"),
             ("available_start_date",),
             ("standard_unit_price",),
+            ("visa_expire_date",),
         ]
 
     @property
@@ -161,9 +164,7 @@ class BPEmployee(BaseModel, TimestampMixin):
         if not self.birthday:
             return self.age or 0
 
-        from datetime import date
-
-        today = date.today()
+        today = today_cached()
         return today.year - self.birthday.year - ((today.month, today.day) < (self.birthday.month, self.birthday.day))
 
     def is_visa_expiring_soon(self, days: int = 90) -> bool:
@@ -171,9 +172,12 @@ class BPEmployee(BaseModel, TimestampMixin):
         if not self.visa_expire_date:
             return False
 
-        from datetime import date, timedelta
+        return self.visa_expire_date <= today_cached() + timedelta(days=days)
 
-        return self.visa_expire_date <= date.today() + timedelta(days=days)
+    @classmethod
+    def filter_visa_expiring(cls, days: int = 90):
+        """ビザ期限が近い要員をDB側で絞り込むクエリ（visa_expire_dateインデックスを使用）"""
+        return cls.filter(visa_expire_date__lte=today_cached() + timedelta(days=days))
 
 
 class BPEmployeeSkill(BaseModel, TimestampMixin):
@@ -262,7 +266,6 @@ class BPSalesRepresentative(BaseModel, TimestampMixin):
         indexes = [
             ("bp_company", "is_active"),
             ("email",),
-            ("is_primary",),
         ]
 
     def __str__(self):
@@ -387,8 +390,6 @@ class BPCompanyContract(BaseModel, TimestampMixin):
     @property
     def is_active(self) -> bool:
         """契約が有効かどうか"""
-        from datetime import date
-
         today = date.today()
 
         if self.status != BPContractStatus.ACTIVE:
@@ -405,8 +406,6 @@ class BPCompanyContract(BaseModel, TimestampMixin):
     @property
     def days_until_expiry(self) -> int:
         """契約終了までの日数"""
-        from datetime import date
-
         today = date.today()
 
         if today > self.contract_end_date:
@@ -423,8 +422,6 @@ class BPCompanyContract(BaseModel, TimestampMixin):
         self, filename: str, file_path: str, file_size: int, mime_type: str, description: str = None
     ) -> None:
         """契約文書を追加"""
-        from datetime import datetime
-
         if self.contract_documents is None:
             self.contract_documents = []
 
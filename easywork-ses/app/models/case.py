@@ -1,6 +1,9 @@
 from datetime import datetime
+from typing import ClassVar
 
 from tortoise import fields
+from tortoise.query_utils import Prefetch
+from tortoise.signals import post_save, pre_save
 
 from app.models.base import BaseModel, TimestampMixin
 from app.models.enums import (
@@ -9,7 +12,16 @@ from app.models.enums import (
     CaseStatus,
     ChangeType,
     ContractCompanyType,
+    PersonType,
 )
+from app.models.personnel import Personnel
+
+# 候補者タイプの表示名
+_CANDIDATE_TYPE_LABELS = {
+    PersonType.BP_EMPLOYEE: "BP社員",
+    PersonType.EMPLOYEE: "自社社員",
+    PersonType.FREELANCER: "フリーランス",
+}
 
 
 class Case(BaseModel, TimestampMixin):
@@ -40,7 +52,7 @@ class Case(BaseModel, TimestampMixin):
     required_skills = fields.TextField(null=True, description="必要スキル")
     preferred_skills = fields.TextField(null=True, description="歓迎スキル")
     unit_price = fields.DecimalField(max_digits=10, decimal_places=0, null=True, description="単価（月額）")
-    required_members = fields.IntField(default=1, description="必要人数")
+    required_members = fields.SmallIntField(default=1, description="必要人数")
 
     # 管理
     status = fields.CharEnumField(CaseStatus, default=CaseStatus.OPEN, description="ステータス")
@@ -59,6 +71,18 @@ class Case(BaseModel, TimestampMixin):
         table = "ses_case"
         table_description = "SES案件情報"
 
+    @classmethod
+    def with_relations(cls, include_candidates: bool = False):
+        """一覧・詳細表示用のクエリ（取引先・担当営業をJOINで取得、必要に応じて候補者も一括取得）"""
+        query = cls.all().select_related(
+            "client_company", "client_sales_representative", "company_sales_representative"
+        )
+        if include_candidates:
+            query = query.prefetch_related(
+                Prefetch("candidates", queryset=CaseCandidate.all().select_related("personnel"))
+            )
+        return query
+
     async def terminate_case(self, termination_date: datetime = None, reason: str = "案件終了", terminated_by: str = None):
         """
         案件終了処理：案件を終了し、関連する全契約も終了する
@@ -148,9 +172,14 @@ class Case(BaseModel, TimestampMixin):
 class CaseCandidate(BaseModel, TimestampMixin):
     """
     案件候補者（BP社員 / 自社社員 / フリーランス）をまとめて管理
+    candidate_name / candidate_type は保存時に同期するスナップショットを返す
     """
 
     case = fields.ForeignKeyField("models.Case", related_name="candidates", description="案件")
+    # 案件の取引先会社（非正規化。保存時に案件から同期し、会社単位の集計をJOINなしで行う）
+    client_company = fields.ForeignKeyField(
+        "models.ClientCompany", null=True, related_name="all_candidates", description="取引先会社"
+    )
 
     # 統一Personnel使用（polymorphic reference）
     personnel = fields.ForeignKeyField(
@@ -175,31 +204,76 @@ class CaseCandidate(BaseModel, TimestampMixin):
 
     remark = fields.TextField(null=True, description="備考")
 
+    # 候補者名・タイプのスナップショット（Personnel保存時にシグナルで同期、一覧表示でJOIN不要）
+    candidate_name_cached = fields.CharField(max_length=255, null=True, description="候補者名（キャッシュ）")
+    candidate_type_cached = fields.CharField(max_length=32, null=True, description="候補者タイプ（キャッシュ）")
+
     class Meta:
         table = "ses_case_candidate"
         table_description = "案件候補者（BP社員/自社社員/フリーランス）"
         # 一つの案件に対して同じ人は一度しか候補になれない制約
         unique_together = [("case", "personnel")]
+        indexes = [
+            ("case", "status"),
+            ("personnel", "status"),
+            ("status", "decision_date"),
+            ("client_company", "status", "created_at"),
+        ]
+
+    # Trueの場合、personnel未取得のままcandidate_name/candidate_typeにアクセスするとエラーにする
+    STRICT_PREFETCH: ClassVar[bool] = False
+
+    # 取引先会社・候補者名スナップショットの再取得要否の判定に使用
+    TRACKED_FIELDS: ClassVar[tuple[str, ...]] = ("case_id", "personnel_id")
+
+    @classmethod
+    def full_query(cls):
+        """
+        一覧・詳細表示用のクエリ（案件を1回のJOINで取得）
+        候補者名・タイプはスナップショット列から返すためpersonnelはJOINしない
+        （既存データのスナップショットは migration_scripts/backfill_candidate_snapshot.py で補完）
+        """
+        return cls.all().select_related("case")
+
+    @staticmethod
+    def personnel_prefetch() -> Prefetch:
+        """候補者名・タイプ表示に必要な列のみ取得するpersonnelのPrefetch"""
+        return Prefetch("personnel", queryset=Personnel.all().only("id", "name", "person_type"))
+
+    @classmethod
+    def list_for_case(cls, case_id: int):
+        """案件の候補者一覧（personnelを1クエリでまとめて取得）"""
+        return cls.filter(case_id=case_id).prefetch_related(cls.personnel_prefetch())
+
+    def _prefetched_personnel(self):
+        """取得済みのpersonnelを返す（遅延取得は行わない）"""
+        personnel = self._loaded_relation("personnel")
+        if personnel is None and self.STRICT_PREFETCH:
+            raise RuntimeError("CaseCandidate.personnel is not prefetched")
+        return personnel
 
     @property
     def candidate_name(self) -> str:
         """候補者名を取得"""
-        if self.personnel:
-            return self.personnel.name
+        if self.personnel_id is None:
+            return "不明"
+        if self.candidate_name_cached is not None:
+            return self.candidate_name_cached
+        personnel = self._prefetched_personnel()
+        if personnel:
+            return personnel.name
         return "不明"
 
     @property
     def candidate_type(self) -> str:
         """候補者タイプを取得"""
-        if self.personnel:
-            from app.models.enums import PersonType
-
-            type_mapping = {
-                PersonType.BP_EMPLOYEE: "BP社員",
-                PersonType.EMPLOYEE: "自社社員",
-                PersonType.FREELANCER: "フリーランス",
-            }
-            return type_mapping.get(self.personnel.person_type, "不明")
+        if self.personnel_id is None:
+            return "不明"
+        if self.candidate_type_cached is not None:
+            return self.candidate_type_cached
+        personnel = self._prefetched_personnel()
+        if personnel:
+            return _CANDIDATE_TYPE_LABELS.get(personnel.person_type, "不明")
         return "不明"
 
 
@@ -208,7 +282,8 @@ class CaseHistory(BaseModel, TimestampMixin):
     案件変更履歴
     """
 
-    case = fields.ForeignKeyField("models.Case", related_name="history", description="案件")
+    # 月次パーティション化（migration_scripts/partition_case_history.py）のためDB上の外部キー制約は持たない
+    case = fields.ForeignKeyField("models.Case", related_name="history", db_constraint=False, description="案件")
     change_type = fields.CharEnumField(ChangeType, description="変更タイプ")
 
     # 変更者情報
@@ -221,6 +296,7 @@ class CaseHistory(BaseModel, TimestampMixin):
     new_value = fields.TextField(null=True, description="変更後の値")
 
     # 変更詳細（JSON形式で複数フィールドの変更を記録）
+    # 表示用のペイロードで検索条件には使わない（MySQLのJSON列は直接インデックス不可、フィールド単位の検索はfield_name列で行う）
     change_details = fields.JSONField(null=True, description="変更詳細（JSON）")
 
     # 変更理由・コメント
@@ -233,3 +309,82 @@ class CaseHistory(BaseModel, TimestampMixin):
         table = "ses_case_history"
         table_description = "案件変更履歴"
         ordering = ["-created_at"]
+        indexes = [
+            ("case", "created_at"),
+            ("change_type", "created_at"),
+            ("changed_by", "created_at"),
+        ]
+
+    @classmethod
+    async def bulk_log(cls, entries: list[dict], batch_size: int = 500) -> list["CaseHistory"]:
+        """
+        履歴を一括登録（1件ずつcreateせず、まとめてINSERT）
+        返却するインスタンスのIDは採番されない
+        """
+        histories = [cls(**entry) for entry in entries]
+        if histories:
+            await cls.bulk_create(histories, batch_size=batch_size)
+        return histories
+
+
+@pre_save(CaseCandidate)
+async def case_candidate_pre_save(sender, instance, using_db, update_fields):
+    """候補者保存前に取引先会社と候補者名・タイプのキャッシュを更新（案件・人材が変わらない保存では取得しない）"""
+    if update_fields:
+        case_changed = "case_id" in update_fields or "case" in update_fields
+        personnel_changed = "personnel_id" in update_fields or "personnel" in update_fields
+    else:
+        case_changed = instance.tracked_field_changed("case_id") or instance.client_company_id is None
+        personnel_changed = instance.tracked_field_changed("personnel_id") or (
+            instance.personnel_id is not None and instance.candidate_name_cached is None
+        )
+
+    if case_changed:
+        case = instance._loaded_relation("case")
+        if case is not None and case.id == instance.case_id:
+            instance.client_company_id = case.client_company_id
+        else:
+            instance.client_company_id = (
+                await Case.filter(id=instance.case_id).first().values_list("client_company_id", flat=True)
+            )
+
+    if not personnel_changed:
+        return
+    if instance.personnel_id is None:
+        instance.candidate_name_cached = None
+        instance.candidate_type_cached = None
+        return
+
+    personnel = instance._loaded_relation("personnel")
+    if personnel is None or personnel.id != instance.personnel_id:
+        personnel = await Personnel.filter(id=instance.personnel_id).only("id", "name", "person_type").first()
+    if personnel:
+        instance.candidate_name_cached = personnel.name
+        instance.candidate_type_cached = _CANDIDATE_TYPE_LABELS.get(personnel.person_type, "不明")
+
+
+@post_save(Case)
+async def case_post_save_sync_candidates(sender, instance, created, using_db, update_fields):
+    """案件の取引先会社変更を候補者に反映"""
+    if created:
+        return
+    if update_fields and "client_company_id" not in update_fields and "client_company" not in update_fields:
+        return
+    await CaseCandidate.filter(case_id=instance.id).exclude(client_company_id=instance.client_company_id).update(
+        client_company_id=instance.client_company_id
+    )
+
+
+@post_save(Personnel)
+async def personnel_post_save_sync_candidates(sender, instance, created, using_db, update_fields):
+    """人材の氏名・タイプ変更を案件候補者のキャッシュに反映（氏名・タイプが変わらない保存ではUPDATEしない）"""
+    if created:
+        return
+    if update_fields and "name" not in update_fields and "person_type" not in update_fields:
+        return
+    if not instance.tracked_field_changed("name") and not instance.tracked_field_changed("person_type"):
+        return
+    await CaseCandidate.filter(personnel_id=instance.id).update(
+        candidate_name_cached=instance.name,
+        candidate_type_cached=_CANDIDATE_TYPE_LABELS.get(instance.person_type, "不明"),
+    )
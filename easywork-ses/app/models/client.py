@@ -1,3 +1,5 @@
+from datetime import datetime
+
 from tortoise import fields
 
 from app.models.base import BaseModel, TimestampMixin
@@ -36,6 +38,7 @@ class ClientCompany(BaseModel, TimestampMixin):
     remark = fields.TextField(null=True, description="備考")
 
     cases: fields.ReverseRelation["Case"]
+    all_candidates: fields.ReverseRelation["CaseCandidate"]
     contacts: fields.ReverseRelation["ClientContact"]
     sales_representatives: fields.ReverseRelation["ClientContact"]
     bank_accounts: fields.ReverseRelation["ClientBankAccount"]
@@ -57,11 +60,11 @@ class ClientContact(BaseModel, TimestampMixin):
     # 基本情報
     name = fields.CharField(max_length=100, description="担当者名")
     name_kana = fields.CharField(max_length=100, null=True, description="担当者名（フリーカナ）")
-    gender = fields.IntField(null=True, default=0, description="性別 (0:不明, 1:男, 2:女)")
+    gender = fields.SmallIntField(null=True, default=0, description="性別 (0:不明, 1:男, 2:女)")
 
     # 連絡先情報
     phone = fields.CharField(max_length=50, null=True, description="電話番号")
-    email = fields.CharField(max_length=100, description="メールアドレス")
+    email = fields.CharField(max_length=100, unique=True, description="メールアドレス")
 
     # ステータス
     is_primary = fields.BooleanField(default=False, description="主担当者かどうか")
@@ -75,8 +78,6 @@ class ClientContact(BaseModel, TimestampMixin):
         table_description = "顧客会社担当者（営業担当者）"
         indexes = [
             ("client_company", "is_active"),
-            ("email",),
-            ("is_primary",),
         ]
 
     def __str__(self):
@@ -104,17 +105,19 @@ class ClientCompanyContract(BaseModel, TimestampMixin):
     # 契約ステータス
     status = fields.CharField(max_length=20, default="active", description="契約ステータス")
 
-    # 契約書類管理
+    # 契約書類管理（旧形式。新規の書類はClientContractDocumentに保存し、既存データは参照のみ）
     contract_documents = fields.JSONField(default=list, description="契約書類ファイル情報")
 
     # 備考
     remark = fields.TextField(null=True, description="備考")
 
+    documents: fields.ReverseRelation["ClientContractDocument"]
+
     class Meta:
         table = "ses_client_company_contract"
         table_description = "顧客会社基本契約"
         indexes = [
-            ("client_company", "status"),
+            ("client_company", "status", "contract_end_date"),
             ("contract_start_date",),
             ("contract_end_date",),
         ]
@@ -125,20 +128,61 @@ class ClientCompanyContract(BaseModel, TimestampMixin):
     async def add_contract_document(
         self, file_name: str, file_path: str, file_size: int = None, upload_date: str = None
     ):
-        """契約書類を追加"""
-        from datetime import datetime
-
+        """契約書類を追加（1行INSERTのみ、契約本体は更新しない）"""
         if upload_date is None:
             upload_date = datetime.now().isoformat()
 
-        document = {"file_name": file_name, "file_path": file_path, "file_size": file_size, "upload_date": upload_date}
+        return await ClientContractDocument.create(
+            contract=self, file_name=file_name, file_path=file_path, file_size=file_size, upload_date=upload_date
+        )
 
-        if self.contract_documents is None:
+    async def replace_contract_documents(self, documents: list[dict]):
+        """契約書類を指定の一覧で置き換え"""
+        await ClientContractDocument.filter(contract_id=self.id).delete()
+        if self.contract_documents:
             self.contract_documents = []
+            await self.save(update_fields=["contract_documents"])
+        await ClientContractDocument.bulk_create(
+            [
+                ClientContractDocument(
+                    contract_id=self.id,
+                    file_name=doc["file_name"],
+                    file_path=doc["file_path"],
+                    file_size=doc.get("file_size"),
+                    upload_date=doc.get("upload_date") or datetime.now().isoformat(),
+                )
+                for doc in documents
+            ]
+        )
+
+    async def get_contract_documents(self) -> list[dict]:
+        """契約書類一覧を取得（旧形式のJSONデータ + 書類テーブル）"""
+        documents = self.documents
+        rows = list(documents) if documents._fetched else await documents.all().order_by("id")
+        return list(self.contract_documents or []) + [row.as_document() for row in rows]
+
+
+class ClientContractDocument(BaseModel, TimestampMixin):
+    """
+    顧客会社契約書類
+    """
 
-        self.contract_documents.append(document)
-        await self.save()
+    contract = fields.ForeignKeyField("models.ClientCompanyContract", related_name="documents", description="契約")
+    file_name = fields.CharField(max_length=255, description="ファイル名")
+    file_path = fields.CharField(max_length=500, description="ファイルパス")
+    file_size = fields.BigIntField(null=True, description="ファイルサイズ")
+    upload_date = fields.CharField(max_length=50, null=True, description="アップロード日時")
 
-    def get_contract_documents(self):
-        """契約書類一覧を取得"""
-        return self.contract_documents or []
+    class Meta:
+        table = "ses_client_contract_document"
+        table_description = "顧客会社契約書類"
+        indexes = [("contract", "id")]
+
+    def as_document(self) -> dict:
+        """旧形式（contract_documents）と同じ構造のdictに変換"""
+        return {
+            "file_name": self.file_name,
+            "file_path": self.file_path,
+            "file_size": self.file_size,
+            "upload_date": self.upload_date,
+        }
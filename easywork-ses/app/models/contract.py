@@ -1,10 +1,20 @@
-from datetime import datetime
+import asyncio
+from dataclasses import dataclass, field
+from datetime import date
 
+import numpy as np
+import orjson
 from tortoise import fields
-from tortoise.signals import post_delete, post_save
-
-from app.models.base import BaseModel, TimestampMixin
+from tortoise.expressions import Q
+from tortoise.manager import Manager
+from tortoise.query_utils import Prefetch
+from tortoise.signals import post_delete, post_save, pre_save
+from tortoise.transactions import in_transaction
+
+from app.models._contract_kernels import compute_payments_batch, payment_kernel
+from app.models.base import BaseModel, TimestampMixin, today_cached
 from app.models.enums import (
+    AmendmentStatus,
     ContractChangeReason,
     ContractChangeType,
     ContractItemType,
@@ -16,6 +26,84 @@ from app.models.enums import (
     WorkRoleClassification,
 )
 
+# 判定で頻繁に参照するEnum値（Enumクラスの属性参照を毎回行わない）
+_ACTIVE_STATUS = ContractStatus.ACTIVE
+_ACTIVE_STATUS_VALUE = ContractStatus.ACTIVE.value
+_BASIC_SALARY_TYPE = ContractItemType.BASIC_SALARY.value
+
+# 控除項目として扱う項目種別
+_DEDUCTION_TYPES = frozenset({ContractItemType.ABSENCE_DEDUCTION, ContractItemType.OTHER_DEDUCTION})
+
+# 支払い単位ごとの月額換算（金額, 実稼働時間, 時間単価）-> 月額
+_UNIT_CONVERTERS = {
+    PaymentUnit.YEN_PER_MONTH: lambda amount, hours, rate: amount,
+    PaymentUnit.TEN_THOUSAND_YEN_PER_MONTH: lambda amount, hours, rate: amount * 10000,
+    # 時間単価：実稼働時間 × 金額
+    PaymentUnit.YEN_PER_HOUR: lambda amount, hours, rate: hours * amount,
+    # 分単価：実稼働時間（分） × 金額
+    PaymentUnit.YEN_PER_MINUTE: lambda amount, hours, rate: hours * 60 * amount,
+    # 日単価：実稼働日数 × 金額（1日8時間として計算）
+    PaymentUnit.YEN_PER_DAY: lambda amount, hours, rate: hours / 8 * amount,
+    # パーセンテージ：基本給（時間単価 × 実稼働時間）に対する割合
+    PaymentUnit.PERCENTAGE: lambda amount, hours, rate: (rate * hours if rate > 0 else 0) * (amount / 100),
+    PaymentUnit.FIXED_AMOUNT: lambda amount, hours, rate: amount,
+}
+
+
+class ContractManager(Manager):
+    """案件・契約人材を常にJOINで取得する契約マネージャー（1:nの関連は対象外、必要時に個別にprefetchすること）"""
+
+    def get_queryset(self):
+        return super().get_queryset().select_related("personnel", "case")
+
+
+# 計算明細の種別 -> 表示用テンプレート（明細は (種別, *値) のタプルで保持し、表示時のみ文字列化する）
+_DETAIL_FORMATS = {
+    "message": "{}",
+    "base_salary": "基本給: {:.0f}円",
+    "overtime": "残業代: {}h × {:.2f}円/h × {} = {:.0f}円",
+    "shortage": "欠勤控除: {}h × {:.2f}円/h × {} = {:.0f}円",
+    "deduction": "{}（控除）: -{:.0f}円 [{}]",
+    "allowance": "{}: +{:.0f}円 [{}]",
+}
+
+
+def format_details(details: list[tuple]) -> list[str]:
+    """計算明細のタプルを表示用の文字列に変換（UI・PDF出力時のみ使用）"""
+    return [_DETAIL_FORMATS[kind].format(*values) for kind, *values in details]
+
+
+@dataclass(slots=True)
+class MonthlyPayment:
+    """月額精算結果"""
+
+    contract_number: str
+    actual_hours: float
+    base_salary: float = 0.0
+    overtime_payment: float = 0.0
+    shortage_deduction: float = 0.0
+    allowances: float = 0.0
+    other_deductions: float = 0.0
+    total_payment: float = 0.0
+    # 計算明細（(種別, *値) のタプル、文字列化はformat_detailsで行う）
+    calculation_details: list = field(default_factory=list)
+    item_details: list = field(default_factory=list)
+
+    def to_dict(self) -> dict:
+        """レスポンス用の辞書に変換"""
+        return {
+            "contract_number": self.contract_number,
+            "actual_hours": self.actual_hours,
+            "base_salary": self.base_salary,
+            "overtime_payment": self.overtime_payment,
+            "shortage_deduction": self.shortage_deduction,
+            "allowances": self.allowances,
+            "other_deductions": self.other_deductions,
+            "total_payment": self.total_payment,
+            "calculation_details": format_details(self.calculation_details),
+            "item_details": self.item_details,
+        }
+
 
 class Contract(BaseModel, TimestampMixin):
     """
@@ -72,124 +160,265 @@ class Contract(BaseModel, TimestampMixin):
     class Meta:
         table = "ses_contract"
         table_description = "SES個別契約管理"
+        manager = ContractManager()
+        indexes = [
+            ("case_id", "status"),
+            ("personnel_id", "status"),
+            ("contract_start_date", "contract_end_date"),
+            # 有効契約の抽出（status + 期間条件）に使用
+            ("status", "contract_end_date"),
+        ]
 
     @property
     def is_active(self) -> bool:
-        """契約が有効かどうかを取得"""
-        active = True
-        if self.status != ContractStatus.ACTIVE.value:
-            active = False
-        # 契約期間が過去かどうかを確認
-        if self.contract_end_date and datetime.now().date() > self.contract_end_date:
-            active = False
+        """契約が有効かどうかを取得（ステータス・終了日の変更が保存前でも反映されるよう毎回判定）"""
+        return self.is_active_for(today_cached())
 
-        return active
+    def is_active_for(self, today: date) -> bool:
+        """指定日時点で契約が有効かどうか（一覧・バッチでは基準日をループ外で1回だけ求めて渡す）"""
+        # DBから取得した値はEnumのため通常は同一性比較で判定が済む（未変換の文字列の場合のみ値を比較）
+        if self.status is not _ACTIVE_STATUS and self.status != _ACTIVE_STATUS_VALUE:
+            return False
+        # 契約期間が過去かどうかを確認
+        end_date = self.contract_end_date
+        return not (end_date and end_date < today)
 
     @property
     def contractor_name(self) -> str:
-        """契約者名を取得"""
-        if self.personnel:
-            return self.personnel.name
-        return "不明"
+        """契約者名を取得（personnel未取得の場合は遅延取得せず「不明」、一覧ではactive_with_partiesで取得すること）"""
+        personnel = self._loaded_relation("personnel")
+        return personnel.name if personnel else "不明"
+
+    @classmethod
+    def active_with_parties(cls):
+        """有効契約を案件・契約人材と共に1クエリ（JOIN）で取得するクエリ"""
+        return cls.filter(status=ContractStatus.ACTIVE).select_related("case", "personnel")
+
+    @staticmethod
+    def active_items_prefetch() -> Prefetch:
+        """有効な精算項目のみを取得するcalculation_itemsのPrefetch"""
+        return Prefetch(
+            "calculation_items",
+            queryset=ContractCalculationItem.filter(is_active=True).order_by("sort_order", "id"),
+        )
 
-    async def calculate_monthly_payment(self, actual_hours: float) -> dict:
-        """SES月額精算計算（完全版）
-        基本給 + 残業代 - 欠勤控除 + 各種手当
+    @classmethod
+    async def calculate_monthly_payments_bulk(
+        cls, contract_ids: list[int], hours_map: dict[int, float], include_details: bool = True
+    ) -> dict:
+        """複数契約の月額精算を一括計算
+        精算項目は1クエリでまとめて取得し、残業代・欠勤控除はベクトル演算で一括計算する
+        合計のみ必要な場合は include_details=False で計算明細の生成を省略する
+
+        Returns:
+            {契約ID: 精算結果（MonthlyPayment）}
         """
-        result = {
-            "contract_number": self.contract_number,
-            "actual_hours": actual_hours,
-            "base_salary": 0.0,
-            "overtime_payment": 0.0,
-            "shortage_deduction": 0.0,
-            "allowances": 0.0,
-            "other_deductions": 0.0,
-            "total_payment": 0.0,
-            "calculation_details": [],
-            "item_details": [],
-        }
+        contracts = await cls.filter(id__in=contract_ids).prefetch_related(cls.active_items_prefetch())
+
+        results = {}
+        rows = []
+        for contract in contracts:
+            actual_hours = hours_map.get(contract.id, 0.0)
+            items = list(contract.calculation_items)
+            base_salary = contract._base_salary_amount(items, actual_hours)
+            if base_salary is None:
+                results[contract.id] = contract._init_payment_result(
+                    actual_hours, "基本給項目が設定されていません" if include_details else None
+                )
+            else:
+                rows.append((contract, items, actual_hours, base_salary))
+
+        if rows:
+            # 契約ごとの値を列単位の配列に展開（上限・下限の未設定はNaN）
+            columns = list(
+                zip(
+                    *(
+                        (
+                            base_salary,
+                            c.standard_working_hours,
+                            c.max_working_hours or np.nan,
+                            c.min_working_hours or np.nan,
+                            c.free_overtime_hours,
+                            c.overtime_rate if c.overtime_rate is not None else 1.0,
+                            c.shortage_rate if c.shortage_rate is not None else 1.0,
+                            actual_hours,
+                        )
+                        for c, _, actual_hours, base_salary in rows
+                    )
+                )
+            )
+            computed = [
+                values.tolist()
+                for values in cls.calculate_monthly_payment_batch(*(np.array(col, dtype=float) for col in columns))
+            ]
+            for (contract, items, actual_hours, base_salary), payment in zip(rows, zip(*computed)):
+                results[contract.id] = contract._build_payment_result(
+                    actual_hours, items, base_salary, *payment, include_details=include_details
+                )
 
-        # 契約項目を全て取得
-        calculation_items = await self.calculation_items.filter(is_active=True).all()
+        return results
+
+    @staticmethod
+    def calculate_monthly_payment_batch(
+        base_salary: np.ndarray,
+        std_hours: np.ndarray,
+        max_hours: np.ndarray,
+        min_hours: np.ndarray,
+        free_overtime_hours: np.ndarray,
+        overtime_rate: np.ndarray,
+        shortage_rate: np.ndarray,
+        actual_hours: np.ndarray,
+    ) -> tuple:
+        """残業代・欠勤控除の配列一括計算（各引数は契約単位のfloat64配列、上限・下限の未設定はNaN）
 
-        # 基本給項目を探す
-        base_salary_item = None
-        hourly_rate = 0.0
+        Returns:
+            (時間単価, 残業時間, 残業代, 不足時間, 欠勤控除) の配列
+        """
+        return compute_payments_batch(
+            base_salary,
+            std_hours,
+            max_hours,
+            min_hours,
+            free_overtime_hours,
+            overtime_rate,
+            shortage_rate,
+            actual_hours,
+        )
 
+    def _init_payment_result(self, actual_hours: float, detail: str | None = None) -> MonthlyPayment:
+        """精算結果の初期値"""
+        return MonthlyPayment(
+            self.contract_number, actual_hours, calculation_details=[("message", detail)] if detail else []
+        )
+
+    @staticmethod
+    def _base_salary_amount(calculation_items: list, actual_hours: float) -> float | None:
+        """基本給項目の月額（基本給項目がない場合はNone）"""
         for item in calculation_items:
-            if item.item_type == ContractItemType.BASIC_SALARY.value:
-                base_salary_item = item
-                # 基本給から時間単価を計算
-                base_salary_amount = item.calculate_monthly_amount(actual_hours, 0)
-                result["base_salary"] = base_salary_amount
-                hourly_rate = base_salary_amount / self.standard_working_hours
-                result["calculation_details"].append(f"基本給: {base_salary_amount:.0f}円")
-                break
-
-        if not base_salary_item:
-            result["calculation_details"].append("基本給項目が設定されていません")
-            return result
+            if item.item_type == _BASIC_SALARY_TYPE:
+                return item.calculate_monthly_amount(actual_hours, 0)
+        return None
 
-        # 残業代計算（上限時間を超えた分）
-        if self.max_working_hours and actual_hours > self.max_working_hours:
-            # 無償残業時間を考慮
-            overtime_hours = actual_hours - self.max_working_hours - self.free_overtime_hours
+    def _build_payment_result(
+        self,
+        actual_hours: float,
+        calculation_items: list,
+        base_salary: float,
+        hourly_rate: float,
+        overtime_hours: float,
+        overtime_payment: float,
+        shortage_hours: float,
+        shortage_deduction: float,
+        include_details: bool = True,
+    ) -> MonthlyPayment:
+        """計算済みの基本給・残業代・欠勤控除から精算結果を組み立て"""
+        details = []
+        if include_details:
+            details.append(("base_salary", base_salary))
             if overtime_hours > 0:
-                overtime_payment = overtime_hours * hourly_rate * self.overtime_rate
-                result["overtime_payment"] = overtime_payment
-                result["calculation_details"].append(
-                    f"残業代: {overtime_hours}h × {hourly_rate:.2f}円/h × {self.overtime_rate} = {overtime_payment:.0f}円"
-                )
-
-        # 欠勤控除計算（下限時間を下回った分）
-        if self.min_working_hours and actual_hours < self.min_working_hours:
-            # 最低労働時間を下回る場合は不足分を控除
-            shortage_hours = self.min_working_hours - actual_hours
-            shortage_deduction = shortage_hours * hourly_rate * self.shortage_rate
-            result["shortage_deduction"] = shortage_deduction
-            result["calculation_details"].append(
-                f"欠勤控除: {shortage_hours}h × {hourly_rate:.2f}円/h × {self.shortage_rate} = {shortage_deduction:.0f}円"
-            )
-
-        # その他の契約項目からの計算（手当・控除項目）
+                details.append(("overtime", overtime_hours, hourly_rate, self.overtime_rate, overtime_payment))
+            if shortage_hours > 0:
+                details.append(("shortage", shortage_hours, hourly_rate, self.shortage_rate, shortage_deduction))
+
+        # その他の契約項目からの計算（手当・控除項目、ローカル変数で集計し最後にまとめて設定）
+        allowances = 0.0
+        other_deductions = 0.0
+        item_details = []
         for item in calculation_items:
             # 基本給は既に処理済みなのでスキップ
-            if item.item_type == ContractItemType.BASIC_SALARY.value:
+            if item.item_type == _BASIC_SALARY_TYPE:
                 continue
 
             monthly_amount = item.calculate_monthly_amount(actual_hours, hourly_rate)
+            is_deduction = item.is_deduction
+
+            item_details.append(
+                {
+                    "id": item.id,
+                    "name": item.item_name,
+                    "type": item.item_type,
+                    "amount": item.amount,
+                    "unit": item.payment_unit,
+                    "monthly_amount": monthly_amount,
+                    "comment": item.comment,
+                    "is_deduction": is_deduction,
+                }
+            )
 
-            item_detail = {
-                "id": item.id,
-                "name": item.item_name,
-                "type": item.item_type,
-                "amount": item.amount,
-                "unit": item.payment_unit,
-                "monthly_amount": monthly_amount,
-                "comment": item.comment,
-                "is_deduction": item.is_deduction,
-            }
-            result["item_details"].append(item_detail)
-
-            if item.is_deduction:
-                result["other_deductions"] += monthly_amount
-                result["calculation_details"].append(
-                    f"{item.item_name}（控除）: -{monthly_amount:.0f}円 [{item.payment_unit}]"
-                )
+            if is_deduction:
+                other_deductions += monthly_amount
+                if include_details:
+                    details.append(("deduction", item.item_name, monthly_amount, item.payment_unit))
             else:
-                result["allowances"] += monthly_amount
-                result["calculation_details"].append(f"{item.item_name}: +{monthly_amount:.0f}円 [{item.payment_unit}]")
-
-        # 合計計算
-        result["total_payment"] = (
-            result["base_salary"]
-            + result["overtime_payment"]
-            + result["allowances"]
-            - result["shortage_deduction"]
-            - result["other_deductions"]
+                allowances += monthly_amount
+                if include_details:
+                    details.append(("allowance", item.item_name, monthly_amount, item.payment_unit))
+
+        return MonthlyPayment(
+            contract_number=self.contract_number,
+            actual_hours=actual_hours,
+            base_salary=base_salary,
+            overtime_payment=overtime_payment,
+            shortage_deduction=shortage_deduction,
+            allowances=allowances,
+            other_deductions=other_deductions,
+            # 合計計算
+            total_payment=base_salary + overtime_payment + allowances - shortage_deduction - other_deductions,
+            calculation_details=details,
+            item_details=item_details,
         )
 
-        return result
+    async def calculate_monthly_payment(
+        self, actual_hours: float, items: list = None, include_details: bool = True
+    ) -> MonthlyPayment:
+        """SES月額精算計算（完全版）
+        基本給 + 残業代 - 欠勤控除 + 各種手当
+
+        Args:
+            actual_hours: 実稼働時間
+            items: 取得済みの有効な精算項目（省略時はDBから取得）
+            include_details: Falseの場合は計算明細（calculation_details）を生成しない
+        """
+        # 契約項目を全て取得（一括計算時は取得済みの項目を使用）
+        if items is not None:
+            calculation_items = items
+        else:
+            calculation_items = await self.calculation_items.filter(is_active=True).order_by("sort_order", "id")
+
+        # 基本給項目の月額
+        base_salary = self._base_salary_amount(calculation_items, actual_hours)
+        if base_salary is None:
+            return self._init_payment_result(
+                actual_hours, "基本給項目が設定されていません" if include_details else None
+            )
+
+        # 残業代（上限超過分、無償残業時間を考慮）・欠勤控除（下限不足分）を計算
+        max_hours = self.max_working_hours or -1.0
+        min_hours = self.min_working_hours or -1.0
+        hourly_rate, overtime_hours, overtime_payment, shortage_hours, shortage_deduction = payment_kernel(
+            max_hours, min_hours
+        )(
+            base_salary,
+            self.standard_working_hours,
+            max_hours,
+            min_hours,
+            self.free_overtime_hours,
+            self.overtime_rate if self.overtime_rate is not None else 1.0,
+            self.shortage_rate if self.shortage_rate is not None else 1.0,
+            actual_hours,
+        )
+
+        return self._build_payment_result(
+            actual_hours,
+            calculation_items,
+            base_salary,
+            hourly_rate,
+            overtime_hours,
+            overtime_payment,
+            shortage_hours,
+            shortage_deduction,
+            include_details=include_details,
+        )
 
     async def record_change(
         self,
@@ -211,8 +440,9 @@ class Contract(BaseModel, TimestampMixin):
             contract=self,
             change_type=change_type,
             change_reason=change_reason,
-            before_values=before_values,
-            after_values=after_values,
+            # 空の辞書はJSONにエンコードせずNULLで保存
+            before_values=before_values or None,
+            after_values=after_values or None,
             change_description=description,
             effective_date=effective_date,
             requested_by=requested_by,
@@ -220,44 +450,147 @@ class Contract(BaseModel, TimestampMixin):
         )
         return change_history
 
+    @staticmethod
+    async def record_changes_bulk(rows: list[dict], batch_size: int = 500):
+        """
+        契約変更履歴をまとめて記録（rowsはContractChangeHistoryのフィールド名をキーとする辞書のリスト）
+        """
+        if rows:
+            await ContractChangeHistory.bulk_create(
+                [ContractChangeHistory(**row) for row in rows], batch_size=batch_size
+            )
+
+    @staticmethod
+    def change_histories_prefetch() -> Prefetch:
+        """変更履歴を新しい順に取得するchange_historiesのPrefetch（件数制限が必要な場合はrecent_changes_bulkを使用）"""
+        return Prefetch("change_histories", queryset=ContractChangeHistory.all().order_by("-created_at", "-id"))
+
     async def get_recent_changes(self, limit: int = 10):
         """
-        最近の変更履歴を取得
+        最近の変更履歴を取得（change_histories_prefetchで取得済みの場合はクエリを発行しない）
         """
+        if self.change_histories._fetched:
+            return list(self.change_histories)[:limit]
         return await self.change_histories.all().order_by("-created_at").limit(limit)
 
+    @classmethod
+    async def recent_changes_bulk(cls, contract_ids: list[int], limit_per: int = 10) -> dict:
+        """
+        複数契約の最近の変更履歴をウィンドウ関数を使い1クエリで取得
+
+        Returns:
+            {契約ID: [変更履歴（新しい順）]}
+        """
+        result = {contract_id: [] for contract_id in contract_ids}
+        if not contract_ids:
+            return result
+
+        ids = ", ".join(str(int(contract_id)) for contract_id in contract_ids)
+        table = ContractChangeHistory._meta.db_table
+        histories = await ContractChangeHistory.raw(
+            f"SELECT * FROM ("
+            f"SELECT h.*, ROW_NUMBER() OVER (PARTITION BY h.contract_id ORDER BY h.created_at DESC, h.id DESC) AS rn "
+            f"FROM {table} h WHERE h.contract_id IN ({ids})"
+            f") t WHERE t.rn <= {int(limit_per)} ORDER BY t.contract_id, t.rn"
+        )
+        for history in histories:
+            result[history.contract_id].append(history)
+        return result
+
     async def terminate_early(
-        self, reason: ContractChangeReason, termination_date, requested_by: str = None, description: str = None
+        self,
+        reason: ContractChangeReason,
+        termination_date,
+        requested_by: str = None,
+        description: str = None,
+        audit: bool = True,
     ):
         """
         早期解約処理
+
+        Args:
+            audit: Falseの場合は変更履歴を記録しない（バッチ同期等）
         """
-        before_values = {"status": self.status, "contract_end_date": str(self.contract_end_date)}
+        # 既に同じ日付で解約済みの場合は更新・履歴記録を行わない
+        if self.status == ContractStatus.TERMINATED and self.contract_end_date == termination_date:
+            return
+
+        if not audit:
+            self.status = ContractStatus.TERMINATED
+            self.contract_end_date = termination_date
+            await self.save(update_fields=["status", "contract_end_date", "updated_at"])
+            await self._update_personnel_status()
+            return
+
+        before_values = {"status": self.status, "contract_end_date": self.contract_end_date}
 
         # ステータスと終了日を更新
         self.status = ContractStatus.TERMINATED
         self.contract_end_date = termination_date
-        await self.save()
+        after_values = {"status": self.status, "contract_end_date": self.contract_end_date}
 
-        # 人材の稼働状況を自動更新
+        # 契約の更新と変更履歴の記録は互いに独立しているため並行して実行
+        await asyncio.gather(
+            self.save(update_fields=["status", "contract_end_date", "updated_at"]),
+            self.record_change(
+                change_type=ContractChangeType.EARLY_TERMINATION,
+                change_reason=reason,
+                before_values=before_values,
+                after_values=after_values,
+                description=description or f"契約を{termination_date}に早期終了",
+                effective_date=termination_date,
+                requested_by=requested_by,
+            ),
+        )
+        await self._update_personnel_status()
+
+    async def _update_personnel_status(self):
+        """人材の稼働状況を自動更新"""
         if self.personnel_id:
             personnel = await self.personnel
             if personnel:
                 await personnel.check_and_update_status_by_contracts()
 
-        after_values = {"status": self.status, "contract_end_date": str(self.contract_end_date)}
+    @classmethod
+    async def terminate_early_bulk(
+        cls, pairs: list[tuple["Contract", date]], reason: ContractChangeReason, requested_by: str = None
+    ):
+        """
+        複数契約の早期解約処理（各契約の更新をコネクションプール上で並行実行）
 
-        # 変更履歴を記録
-        await self.record_change(
-            change_type=ContractChangeType.EARLY_TERMINATION,
-            change_reason=reason,
-            before_values=before_values,
-            after_values=after_values,
-            description=description or f"契約を{termination_date}に早期終了",
-            effective_date=termination_date,
-            requested_by=requested_by,
+        Args:
+            pairs: (契約, 解約日) のリスト
+        """
+        await asyncio.gather(
+            *(
+                contract.terminate_early(reason=reason, termination_date=termination_date, requested_by=requested_by)
+                for contract, termination_date in pairs
+            )
         )
 
+    def _apply_conditions(self, base_salary_item, new_base_salary: float = None, new_working_hours: float = None):
+        """条件変更をメモリ上のインスタンスに反映し、(変更前の値, 変更後の値, 変更内容) を返す"""
+        before_values = {}
+        after_values = {}
+        changes = []
+
+        # 値が変わらない項目は変更として扱わない（変更履歴も記録しない）
+        if new_base_salary is not None and base_salary_item and new_base_salary != base_salary_item.amount:
+            old_base_salary = base_salary_item.amount
+            base_salary_item.amount = new_base_salary
+            before_values["base_salary"] = old_base_salary
+            after_values["base_salary"] = new_base_salary
+            changes.append(f"基本給: {old_base_salary}円 → {new_base_salary}円")
+
+        if new_working_hours is not None and new_working_hours != self.standard_working_hours:
+            old_working_hours = self.standard_working_hours
+            self.standard_working_hours = new_working_hours
+            before_values["standard_working_hours"] = old_working_hours
+            after_values["standard_working_hours"] = new_working_hours
+            changes.append(f"標準稼働時間: {old_working_hours}h → {new_working_hours}h")
+
+        return before_values, after_values, changes
+
     async def update_conditions(
         self,
         new_base_salary: float = None,
@@ -265,46 +598,126 @@ class Contract(BaseModel, TimestampMixin):
         reason: ContractChangeReason = ContractChangeReason.CLIENT_REQUEST,
         effective_date=None,
         requested_by: str = None,
+        audit_buffer: list = None,
+        audit: bool = True,
     ):
         """
         契約条件変更処理
-        """
-        before_values = {}
-        after_values = {}
-        changes = []
 
+        Args:
+            audit_buffer: 指定時は変更履歴を即時登録せずこのリストに追加する（呼び出し側でrecord_changes_bulkにより一括登録）
+            audit: Falseの場合は変更前後の値を組み立てず、変更履歴も記録しない（バッチ同期等）
+        """
+        base_salary_item = None
         if new_base_salary is not None:
             # 基本給項目を更新
             base_salary_item = await self.calculation_items.filter(
                 item_type=ContractItemType.BASIC_SALARY.value
             ).first()
-            if base_salary_item:
-                before_values["base_salary"] = str(base_salary_item.amount)
+
+        if not audit:
+            if new_base_salary is not None and base_salary_item and new_base_salary != base_salary_item.amount:
                 base_salary_item.amount = new_base_salary
-                await base_salary_item.save()
-                after_values["base_salary"] = str(base_salary_item.amount)
-                changes.append(f"基本給: {before_values['base_salary']}円 → {after_values['base_salary']}円")
+                await base_salary_item.save(update_fields=["amount", "updated_at"])
+            if new_working_hours is not None and new_working_hours != self.standard_working_hours:
+                self.standard_working_hours = new_working_hours
+                await self.save(update_fields=["standard_working_hours", "updated_at"])
+            return
+
+        before_values, after_values, changes = self._apply_conditions(
+            base_salary_item, new_base_salary, new_working_hours
+        )
+        if not changes:
+            return
 
-        if new_working_hours is not None:
-            before_values["standard_working_hours"] = str(self.standard_working_hours)
-            self.standard_working_hours = new_working_hours
-            after_values["standard_working_hours"] = str(self.standard_working_hours)
-            changes.append(
-                f"標準稼働時間: {before_values['standard_working_hours']}h → {after_values['standard_working_hours']}h"
-            )
-            await self.save()
+        # 変更した列のみ更新
+        if "base_salary" in before_values:
+            await base_salary_item.save(update_fields=["amount", "updated_at"])
+        if "standard_working_hours" in before_values:
+            await self.save(update_fields=["standard_working_hours", "updated_at"])
 
-        if changes:
-            # 変更履歴を記録
-            await self.record_change(
-                change_type=ContractChangeType.CONDITION_CHANGE,
-                change_reason=reason,
-                before_values=before_values,
-                after_values=after_values,
-                description="契約条件変更: " + ", ".join(changes),
-                effective_date=effective_date,
-                requested_by=requested_by,
+        # 変更履歴を記録
+        history = self._condition_change_row(before_values, after_values, changes, reason, effective_date, requested_by)
+        if audit_buffer is not None:
+            audit_buffer.append(history)
+        else:
+            await ContractChangeHistory.create(**history)
+
+    def _condition_change_row(self, before_values, after_values, changes, reason, effective_date, requested_by) -> dict:
+        """条件変更の変更履歴（record_changes_bulk用の辞書）"""
+        return {
+            "contract": self,
+            "change_type": ContractChangeType.CONDITION_CHANGE,
+            "change_reason": reason,
+            "before_values": before_values,
+            "after_values": after_values,
+            "change_description": "契約条件変更: " + ", ".join(changes),
+            "effective_date": effective_date,
+            "requested_by": requested_by,
+        }
+
+    @classmethod
+    async def bulk_update_conditions(
+        cls,
+        updates: list[tuple["Contract", float | None, float | None]],
+        reason: ContractChangeReason = ContractChangeReason.CLIENT_REQUEST,
+        effective_date=None,
+        requested_by: str = None,
+        batch_size: int = 500,
+    ):
+        """
+        複数契約の条件一括変更（年度単価改定等）
+        契約・基本給項目の更新と変更履歴の記録をそれぞれ一括で実行する
+
+        Args:
+            updates: (契約, 新基本給, 新標準稼働時間) のリスト（変更しない項目はNone）
+        """
+        # 基本給項目は対象契約分をまとめて取得（契約ごとに最初の基本給項目を使用）
+        base_salary_items = {}
+        salary_contract_ids = [contract.id for contract, new_base_salary, _ in updates if new_base_salary is not None]
+        if salary_contract_ids:
+            for item in await ContractCalculationItem.filter(
+                contract_id__in=salary_contract_ids, item_type=ContractItemType.BASIC_SALARY.value
+            ).order_by("id"):
+                base_salary_items.setdefault(item.contract_id, item)
+
+        changed_contracts = []
+        changed_items = []
+        histories = []
+        for contract, new_base_salary, new_working_hours in updates:
+            base_salary_item = base_salary_items.get(contract.id)
+            before_values, after_values, changes = contract._apply_conditions(
+                base_salary_item, new_base_salary, new_working_hours
             )
+            if not changes:
+                continue
+            if "base_salary" in before_values:
+                changed_items.append(base_salary_item)
+            if "standard_working_hours" in before_values:
+                changed_contracts.append(contract)
+            histories.append(
+                contract._condition_change_row(
+                    before_values, after_values, changes, reason, effective_date, requested_by
+                )
+            )
+
+        async with in_transaction():
+            if changed_contracts:
+                await cls.bulk_update(changed_contracts, fields=["standard_working_hours"], batch_size=batch_size)
+            if changed_items:
+                await ContractCalculationItem.bulk_update(changed_items, fields=["amount"], batch_size=batch_size)
+            await cls.record_changes_bulk(histories, batch_size=batch_size)
+
+
+def _json_dumps(value) -> str:
+    return orjson.dumps(value).decode()
+
+
+class ContractChangeHistoryManager(Manager):
+    """対象契約を常にJOINで取得する変更履歴マネージャー（一覧・ログ出力時の__str__で契約を遅延取得しないため）"""
+
+    def get_queryset(self):
+        return super().get_queryset().select_related("contract")
 
 
 class ContractChangeHistory(BaseModel, TimestampMixin):
@@ -320,9 +733,9 @@ class ContractChangeHistory(BaseModel, TimestampMixin):
     change_type = fields.CharEnumField(ContractChangeType, description="変更種別")
     change_reason = fields.CharEnumField(ContractChangeReason, null=True, description="変更理由")
 
-    # 変更前後の値（JSON形式で格納）
-    before_values = fields.JSONField(null=True, description="変更前の値")
-    after_values = fields.JSONField(null=True, description="変更後の値")
+    # 変更前後の値（JSON形式で格納、数値・日付・Enumは文字列化せずorjsonでそのままエンコード）
+    before_values = fields.JSONField(null=True, encoder=_json_dumps, decoder=orjson.loads, description="変更前の値")
+    after_values = fields.JSONField(null=True, encoder=_json_dumps, decoder=orjson.loads, description="変更後の値")
 
     # 変更詳細
     change_description = fields.TextField(null=True, description="変更内容の詳細説明")
@@ -344,14 +757,18 @@ class ContractChangeHistory(BaseModel, TimestampMixin):
     class Meta:
         table = "ses_contract_change_history"
         table_description = "契約変更履歴"
+        manager = ContractChangeHistoryManager()
         indexes = [
             ("contract_id", "change_type"),
+            # 契約ごとの最新履歴取得（WHERE contract_id ORDER BY created_at DESC LIMIT n）
+            ("contract_id", "created_at"),
             ("effective_date",),
-            ("created_at",),
         ]
 
     def __str__(self):
-        return f"契約{self.contract.contract_number} - {self.change_type} ({self.created_at.strftime('%Y-%m-%d')})"
+        contract = self._loaded_relation("contract")
+        contract_number = contract.contract_number if contract else self.contract_id
+        return f"契約{contract_number} - {self.change_type} ({self.created_at.strftime('%Y-%m-%d')})"
 
 
 class ContractAmendment(BaseModel, TimestampMixin):
@@ -393,30 +810,39 @@ class ContractAmendment(BaseModel, TimestampMixin):
     personnel_acknowledged = fields.BooleanField(default=False, description="人材確認")
     personnel_acknowledged_date = fields.DatetimeField(null=True, description="人材確認日")
 
+    # 全当事者承認済みフラグ（上記3項目から保存時に算出、一覧の絞り込み用）
+    is_fully_approved = fields.BooleanField(default=False, description="全当事者承認済み")
+
     # 文書管理
     document_path = fields.CharField(max_length=500, null=True, description="修正書ファイルパス")
     digital_signature = fields.TextField(null=True, description="デジタル署名")
 
     # ステータス
-    status = fields.CharField(max_length=20, default="草案", description="修正書ステータス")  # 草案、承認待ち、承認済み、発効中、終了
+    status = fields.CharEnumField(AmendmentStatus, default=AmendmentStatus.DRAFT, description="修正書ステータス")
 
     class Meta:
         table = "ses_contract_amendment"
         table_description = "契約修正書"
         indexes = [
-            ("original_contract_id",),
+            ("original_contract_id", "is_fully_approved"),
             ("effective_start_date",),
-            ("status",),
+            ("status", "effective_start_date"),
         ]
 
+    @classmethod
+    def effective_qs(cls, today: date = None):
+        """有効な修正書を取得するクエリ（is_effective と同じ条件をSQLで判定）"""
+        today = today or today_cached()
+        return cls.filter(status=AmendmentStatus.ACTIVE, effective_start_date__lte=today).filter(
+            Q(effective_end_date__isnull=True) | Q(effective_end_date__gte=today)
+        )
+
     @property
     def is_effective(self) -> bool:
-        """修正書が有効かどうか"""
-        from datetime import date
+        """修正書が有効かどうか（一覧の絞り込みには effective_qs を使用）"""
+        today = today_cached()
 
-        today = date.today()
-
-        if self.status != "発効中":
+        if self.status is not AmendmentStatus.ACTIVE and self.status != AmendmentStatus.ACTIVE.value:
             return False
 
         if today < self.effective_start_date:
@@ -429,7 +855,7 @@ class ContractAmendment(BaseModel, TimestampMixin):
 
     @property
     def all_parties_approved(self) -> bool:
-        """全当事者の承認が完了しているか"""
+        """全当事者の承認が完了しているか（DB上での絞り込みは is_fully_approved を使用）"""
         return self.client_approved and self.company_approved and self.personnel_acknowledged
 
     def __str__(self):
@@ -477,7 +903,7 @@ class ContractCalculationItem(BaseModel, TimestampMixin):
     @property
     def is_deduction(self) -> bool:
         """控除項目かどうかを判定"""
-        return self.item_type in [ContractItemType.ABSENCE_DEDUCTION, ContractItemType.OTHER_DEDUCTION]
+        return self.item_type in _DEDUCTION_TYPES
 
     def calculate_monthly_amount(self, actual_hours: float = 0, hourly_rate: float = 0) -> float:
         """月額換算金額を計算
@@ -489,28 +915,10 @@ class ContractCalculationItem(BaseModel, TimestampMixin):
         Returns:
             月額換算金額
         """
-        if self.payment_unit == PaymentUnit.YEN_PER_MONTH:
-            return self.amount
-        elif self.payment_unit == PaymentUnit.TEN_THOUSAND_YEN_PER_MONTH:
-            return self.amount * 10000
-        elif self.payment_unit == PaymentUnit.YEN_PER_HOUR:
-            # 時間単価：実稼働時間 × 金額
-            return actual_hours * self.amount
-        elif self.payment_unit == PaymentUnit.YEN_PER_MINUTE:
-            # 分単価：実稼働時間（分） × 金額
-            return actual_hours * 60 * self.amount
-        elif self.payment_unit == PaymentUnit.YEN_PER_DAY:
-            # 日単価：実稼働日数 × 金額（1日8時間として計算）
-            working_days = actual_hours / 8
-            return working_days * self.amount
-        elif self.payment_unit == PaymentUnit.PERCENTAGE:
-            # パーセンテージ：基本給に対する割合
-            base_salary = hourly_rate * actual_hours if hourly_rate > 0 else 0
-            return base_salary * (self.amount / 100)
-        elif self.payment_unit == PaymentUnit.FIXED_AMOUNT:
-            return self.amount
-        else:
+        convert = _UNIT_CONVERTERS.get(self.payment_unit)
+        if convert is None:
             return self.amount
+        return convert(self.amount, actual_hours, hourly_rate)
 
 
 # Contract信号处理：自动更新Personnel的稼働状态
@@ -523,6 +931,12 @@ async def contract_post_save(sender, instance, created, using_db, update_fields)
             await personnel.check_and_update_status_by_contracts()
 
 
+@pre_save(ContractAmendment)
+async def contract_amendment_pre_save(sender, instance, using_db, update_fields):
+    """修正書保存前に全当事者承認済みフラグを更新"""
+    instance.is_fully_approved = instance.all_parties_approved
+
+
 @post_delete(Contract)
 async def contract_post_delete(sender, instance, using_db):
     """契約削除後に人材の稼働状況を自動更新"""
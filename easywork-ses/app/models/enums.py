@@ -1,14 +1,24 @@
-from enum import Enum, IntEnum, StrEnum
+from enum import Enum, EnumType, IntEnum, StrEnum
 
 
-class EnumBase(Enum):
+class _EnumMeta(EnumType):
+    """クラス定義時にメンバーの値・名前をVALUES/NAMESとして保持するメタクラス"""
+
+    def __init__(cls, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        cls.VALUES = tuple(member.value for member in cls)
+        cls.NAMES = tuple(cls._member_names_)
+
+
+class EnumBase(Enum, metaclass=_EnumMeta):
+    # メンバーは定義後に変わらないためクラス定義時に計算済みのVALUES/NAMESを返す
     @classmethod
     def get_member_values(cls):
-        return [item.value for item in cls._member_map_.values()]
+        return cls.VALUES
 
     @classmethod
     def get_member_names(cls):
-        return [name for name in cls._member_names_]
+        return cls.NAMES
 
 
 class MethodType(StrEnum):
@@ -225,20 +235,20 @@ class WorkLocation(StrEnum):
 
 
 # Enum定義
-class ContractStatus(StrEnum):
+class ContractStatus(StrEnum, metaclass=_EnumMeta):
     ACTIVE = "有効"  # 有効
     SUSPENDED = "一時中断"  # 一時中断
     TERMINATED = "終了"  # 終了
     CANCELLED = "キャンセル"  # キャンセル
 
 
-class ContractType(StrEnum):
+class ContractType(StrEnum, metaclass=_EnumMeta):
     BP_EMPLOYEE = "BP社員"  # BP社員
     EMPLOYEE = "自社社員"  # 自社社員
     FREELANCER = "フリーランス"  # フリーランス
 
 
-class ContractChangeType(StrEnum):
+class ContractChangeType(StrEnum, metaclass=_EnumMeta):
     """契約変更種別"""
 
     CONTRACT_RENEWAL = "契約更新"  # 契約更新
@@ -252,7 +262,7 @@ class ContractChangeType(StrEnum):
     RESUMPTION = "再開"  # 再開
 
 
-class ContractChangeReason(StrEnum):
+class ContractChangeReason(StrEnum, metaclass=_EnumMeta):
     """契約変更理由"""
 
     CLIENT_REQUEST = "クライアント要望"  # クライアント要望
@@ -267,7 +277,17 @@ class ContractChangeReason(StrEnum):
     OTHER = "その他"  # その他
 
 
-class ContractItemType(StrEnum):
+class AmendmentStatus(StrEnum, metaclass=_EnumMeta):
+    """契約修正書ステータス"""
+
+    DRAFT = "草案"  # 草案
+    PENDING = "承認待ち"  # 承認待ち
+    APPROVED = "承認済み"  # 承認済み
+    ACTIVE = "発効中"  # 発効中
+    ENDED = "終了"  # 終了
+
+
+class ContractItemType(StrEnum, metaclass=_EnumMeta):
     """契約項目種別"""
 
     BASIC_SALARY = "基本給"  # 基本給
@@ -281,7 +301,7 @@ class ContractItemType(StrEnum):
     OTHER_DEDUCTION = "その他控除"  # その他控除
 
 
-class PaymentUnit(StrEnum):
+class PaymentUnit(StrEnum, metaclass=_EnumMeta):
     """支払い単位"""
 
     YEN_PER_MONTH = "円/月"  # 円/月
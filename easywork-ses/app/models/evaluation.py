@@ -1,8 +1,15 @@
+from typing import ClassVar
+
 from tortoise import fields
+from tortoise.signals import pre_save
 
+from app.core.ctx import CTX_PERSONNEL_CACHE
 from app.models.base import BaseModel, TimestampMixin
 from app.models.enums import PersonType
 
+# 評価対象の人材が未取得であることを示す値（取得済みで該当なしのNoneと区別する）
+_UNSET = object()
+
 
 class PersonEvaluation(BaseModel, TimestampMixin):
     """
@@ -10,7 +17,16 @@ class PersonEvaluation(BaseModel, TimestampMixin):
     Personnel統一モデルに対応
     """
 
-    # 評価対象の指定（polymorphic reference）
+    # 評価対象の人材（JOINで取得できるよう外部キーで保持）
+    personnel = fields.ForeignKeyField(
+        "models.Personnel",
+        related_name="evaluations",
+        null=True,
+        on_delete=fields.SET_NULL,
+        description="評価対象人材（削除時も評価は監査用に残す）",
+    )
+
+    # 評価対象の指定（polymorphic reference、移行・監査用に保持）
     person_type = fields.CharEnumField(PersonType, description="人材タイプ（bp_employee/freelancer/employee）")
     person_id = fields.BigIntField(description="対象人材ID")
 
@@ -45,15 +61,60 @@ class PersonEvaluation(BaseModel, TimestampMixin):
         table_description = "統一人材評価記録"
         indexes = [
             ("person_type", "person_id"),
+            ("personnel_id",),
             ("case_id",),
             ("contract_id",),
             ("evaluation_date",),
             ("overall_rating",),
         ]
 
+    # 旧参照（person_id）から外部キーへの同期要否の判定に使用
+    TRACKED_FIELDS: ClassVar[tuple[str, ...]] = ("person_id",)
+
+    async def save(self, *args, update_fields=None, **kwargs):
+        """保存処理（person_idの部分更新時は、pre_saveで同期する外部キーも合わせて保存）"""
+        if update_fields is not None:
+            update_fields = list(update_fields)
+            if "person_id" in update_fields and "personnel_id" not in update_fields:
+                update_fields.append("personnel_id")
+        await super().save(*args, update_fields=update_fields, **kwargs)
+
+    @classmethod
+    def with_related(cls):
+        """一覧表示用に評価対象人材・案件・契約をJOINで取得するクエリセット"""
+        return cls.all().select_related("personnel", "case", "contract")
+
+    @classmethod
+    async def bulk_attach_persons(cls, evaluations: list["PersonEvaluation"]):
+        """評価対象の人材をまとめて取得し各評価に設定（get_person_objectで個別に取得しない）"""
+        from app.models.personnel import Personnel
+
+        # with_relatedで人材を取得済みの評価は対象外
+        pending = [evaluation for evaluation in evaluations if evaluation._joined_personnel() is None]
+        person_ids = {evaluation.person_id for evaluation in pending}
+        if not person_ids:
+            return
+        persons = {(person.person_type, person.id): person for person in await Personnel.filter(id__in=person_ids)}
+        cache = CTX_PERSONNEL_CACHE.get()
+        for evaluation in pending:
+            key = (evaluation.person_type, evaluation.person_id)
+            evaluation._person = persons.get(key)
+            if cache is not None:
+                cache[key] = evaluation._person
+
+    def _joined_personnel(self):
+        """JOINで取得済みの評価対象人材（人材タイプが一致しない場合はNone）"""
+        personnel = self._loaded_relation("personnel")
+        if personnel is not None and personnel.person_type == self.person_type:
+            return personnel
+        return None
+
     @property
     def person_name(self) -> str:
         """評価対象の名前を取得（表示用）"""
+        personnel = self._joined_personnel()
+        if personnel is not None:
+            return personnel.name
         return f"{self.person_type.upper()}-{self.person_id}"
 
     def has_extended_fields(self) -> bool:
@@ -61,12 +122,44 @@ class PersonEvaluation(BaseModel, TimestampMixin):
         return self.person_type in [PersonType.FREELANCER, PersonType.EMPLOYEE]
 
     async def get_person_object(self):
-        """評価対象の実際のオブジェクトを取得"""
-        from app.models.personnel import Personnel
+        """
+        評価対象の実際のオブジェクトを取得
+        取得結果はインスタンスとリクエスト単位のキャッシュに保持し、同じ人材を再度取得しない
+        """
+        personnel = self._joined_personnel()
+        if personnel is not None:
+            return personnel
+
+        person = getattr(self, "_person", _UNSET)
+        if person is not _UNSET:
+            return person
+
+        key = (self.person_type, self.person_id)
+        cache = CTX_PERSONNEL_CACHE.get()
+        if cache is not None and key in cache:
+            person = cache[key]
+        else:
+            from app.models.personnel import Personnel
 
-        return await Personnel.get_or_none(id=self.person_id, person_type=self.person_type)
+            person = await Personnel.get_or_none(id=self.person_id, person_type=self.person_type)
+            if cache is not None:
+                cache[key] = person
+        self._person = person
+        return person
 
     async def get_person_name(self) -> str:
         """評価対象の実際の名前を取得"""
         person = await self.get_person_object()
         return person.name if person else f"Unknown-{self.person_id}"
+
+
+@pre_save(PersonEvaluation)
+async def person_evaluation_pre_save(sender, instance: PersonEvaluation, using_db, update_fields):
+    """
+    評価対象の外部キーと旧参照（person_id）を同期
+    person_id が変更された場合のみ外部キーに反映する（人材削除で外部キーがNULLになった評価を再保存しても復元しない）
+    """
+    if instance.person_id is None:
+        instance.person_id = instance.personnel_id
+    elif (update_fields is None or "person_id" in update_fields) and instance.tracked_field_changed("person_id"):
+        instance.personnel_id = instance.person_id
@@ -1,7 +1,14 @@
+import asyncio
+import uuid
+from collections import defaultdict
 from datetime import datetime, date
 
 from tortoise import fields
-from tortoise.signals import post_save
+from tortoise.expressions import F, Value, When
+from tortoise.expressions import Case as SqlCase  # app.modelsの案件モデル（Case）と名前が衝突するため別名
+from tortoise.functions import Sum
+from tortoise.signals import post_save, pre_save
+from tortoise.transactions import in_transaction
 
 from app.models.base import BaseModel, TimestampMixin
 from app.models.enums import (
@@ -91,6 +98,8 @@ class FinanceTransaction(BaseModel, TimestampMixin):
         table_description = "財務取引記録"
         indexes = [
             ("transaction_type", "category"),
+            # 予算の使用済み金額の集計用（amountまで含めてインデックスのみで合計できる）
+            ("category", "transaction_type", "status", "approval_status", "payment_date", "amount"),
             ("payment_date",),
             ("status", "approval_status"),
             ("case_id",),
@@ -101,6 +110,11 @@ class FinanceTransaction(BaseModel, TimestampMixin):
     def __str__(self):
         return f"{self.transaction_number} - {self.title} (¥{self.amount:,.0f})"
 
+    @classmethod
+    def with_related(cls):
+        """一覧・詳細表示用に関連する案件・契約・人材・定期取引ルール・親取引をJOINで取得するクエリセット"""
+        return cls.all().select_related("case", "contract", "personnel", "recurrence_rule", "parent_transaction")
+
     @property
     def is_income(self) -> bool:
         """収入取引かどうか"""
@@ -117,7 +131,24 @@ class FinanceTransaction(BaseModel, TimestampMixin):
         sign = "+" if self.is_income else "-"
         return f"{sign}¥{self.amount:,.0f}"
 
-    async def calculate_tax_amount(self) -> float:
+    def budget_entry(self):
+        """予算の使用済み金額に計上される取引の場合は (カテゴリ, 支払日, 金額) を返す"""
+        if (
+            self.status == FinanceStatus.COMPLETED
+            and self.approval_status == FinanceApprovalStatus.APPROVED
+            and self.is_expense
+            and self.payment_date
+        ):
+            return self.category, self.payment_date, self.amount
+        return None
+
+    async def save(self, *args, update_fields=None, **kwargs):
+        """保存処理（金額・税率の部分更新時は、pre_saveで再計算する税額・税抜金額も合わせて保存）"""
+        if update_fields is not None and not _TAX_SOURCE_FIELDS.isdisjoint(update_fields):
+            update_fields = [*update_fields, *(field for field in _TAX_FIELDS if field not in update_fields)]
+        await super().save(*args, update_fields=update_fields, **kwargs)
+
+    def calculate_tax_amount(self) -> float:
         """税額を計算"""
         if self.tax_rate > 0:
             return self.amount * (self.tax_rate / 100)
@@ -130,7 +161,7 @@ class FinanceTransaction(BaseModel, TimestampMixin):
         self.approved_at = datetime.now()
         if notes:
             self.notes = f"{self.notes or ''}\n承認: {notes}".strip()
-        await self.save()
+        await self.save(update_fields=["approval_status", "approved_by", "approved_at", "notes", "updated_at"])
 
     async def reject(self, rejected_by: str, reason: str):
         """取引を拒否"""
@@ -138,7 +169,38 @@ class FinanceTransaction(BaseModel, TimestampMixin):
         self.approved_by = rejected_by
         self.approved_at = datetime.now()
         self.notes = f"{self.notes or ''}\n拒否理由: {reason}".strip()
-        await self.save()
+        await self.save(update_fields=["approval_status", "approved_by", "approved_at", "notes", "updated_at"])
+
+    @classmethod
+    async def bulk_approve(cls, ids: list[int], approved_by: str) -> int:
+        """
+        複数取引を一括承認（取引は1回のUPDATE、予算はカテゴリ・支払日ごとにまとめて差分更新）
+        post_saveは発火しないため、予算への反映はここで行う
+        """
+        if not ids:
+            return 0
+
+        async with in_transaction():
+            # 承認により新たに予算へ計上される取引（完了済みの未承認の支出）
+            entries = await cls.filter(
+                id__in=ids,
+                approval_status__not=FinanceApprovalStatus.APPROVED,
+                status=FinanceStatus.COMPLETED,
+                transaction_type=FinanceTransactionType.EXPENSE,
+                payment_date__isnull=False,
+            ).values_list("category", "payment_date", "amount")
+
+            updated = await cls.filter(id__in=ids).update(
+                approval_status=FinanceApprovalStatus.APPROVED, approved_by=approved_by, approved_at=datetime.now()
+            )
+
+            deltas = defaultdict(float)
+            for category, payment_date, amount in entries:
+                deltas[(category, payment_date)] += amount
+            for (category, payment_date), delta in deltas.items():
+                await FinanceBudget.apply_delta(category, payment_date, delta)
+
+        return updated
 
 
 class FinanceRecurrenceRule(BaseModel, TimestampMixin):
@@ -206,28 +268,62 @@ class FinanceRecurrenceRule(BaseModel, TimestampMixin):
         # 具体的な日付計算ロジックは実装時に詳細化
         return True
 
-    async def create_transaction(self) -> "FinanceTransaction":
-        """定期取引を作成"""
-        from datetime import date
-
-        transaction = await FinanceTransaction.create(
-            transaction_number=f"REC-{self.id}-{date.today().strftime('%Y%m%d')}",
+    def build_transaction(self, today: date) -> "FinanceTransaction":
+        """定期取引のインスタンスを生成（未保存、bulk_createではpre_saveが動かないため税額もここで設定）"""
+        transaction = FinanceTransaction(
+            transaction_number=f"REC-{self.id}-{today.strftime('%Y%m%d')}",
             transaction_type=self.transaction_type,
-            title=self.title_template.format(date=date.today()),
+            title=self.title_template.format(date=today),
             amount=self.amount,
             category=self.category,
             recurrence_rule=self,
             is_recurring=True,
             status=FinanceStatus.PENDING,
         )
+        transaction.tax_amount = transaction.calculate_tax_amount()
+        transaction.tax_exclusive_amount = transaction.amount - transaction.tax_amount
+        return transaction
+
+    async def create_transaction(self) -> "FinanceTransaction":
+        """定期取引を作成"""
+        today = date.today()
+        transaction = self.build_transaction(today)
+        await transaction.save()
 
         # 実行記録更新
-        self.last_executed = date.today()
+        self.last_executed = today
         self.execution_count += 1
-        await self.save()
+        await self.save(update_fields=["last_executed", "execution_count", "updated_at"])
 
         return transaction
 
+    @classmethod
+    async def bulk_execute(
+        cls, rules: list["FinanceRecurrenceRule"], batch_size: int = 500
+    ) -> list["FinanceTransaction"]:
+        """
+        複数ルールの定期取引をまとめて作成（取引は一括INSERT、実行記録は1回のUPDATEで更新）
+        bulk_createではIDが採番されないため、作成した取引は取引番号で再取得して返す
+        """
+        if not rules:
+            return []
+
+        today = date.today()
+        transactions = [rule.build_transaction(today) for rule in rules]
+        async with in_transaction():
+            await FinanceTransaction.bulk_create(transactions, batch_size=batch_size)
+            await cls.filter(id__in=[rule.id for rule in rules]).update(
+                last_executed=today, execution_count=F("execution_count") + 1
+            )
+            created = await FinanceTransaction.filter(
+                transaction_number__in=[transaction.transaction_number for transaction in transactions]
+            ).order_by("id")
+
+        for rule in rules:
+            rule.last_executed = today
+            rule.execution_count += 1
+        return created
+
 
 class FinanceAttachment(BaseModel, TimestampMixin):
     """
@@ -302,6 +398,7 @@ class FinanceBudget(BaseModel, TimestampMixin):
     budget_amount = fields.FloatField(description="予算金額")
     spent_amount = fields.FloatField(default=0.0, description="使用済み金額")
     remaining_amount = fields.FloatField(default=0.0, description="残予算")
+    usage_percentage = fields.FloatField(default=0.0, description="使用率（%）")
 
     # アラート設定
     warning_threshold = fields.FloatField(default=80.0, description="警告閾値（%）")
@@ -316,19 +413,32 @@ class FinanceBudget(BaseModel, TimestampMixin):
         table_description = "予算管理"
         indexes = [
             ("category", "period_start"),
-            ("is_active",),
+            # 有効な予算の残予算順の一覧（残予算の少ない予算の抽出）
+            ("is_active", "remaining_amount"),
+            # 有効な予算の使用率での絞り込み（警告・アラート閾値超過の抽出）
+            ("is_active", "usage_percentage"),
         ]
 
     def __str__(self):
         return f"{self.budget_name} - ¥{self.budget_amount:,.0f}"
 
-    @property
-    def usage_percentage(self) -> float:
-        """使用率（%）"""
-        if self.budget_amount > 0:
-            return (self.spent_amount / self.budget_amount) * 100
+    @staticmethod
+    def calc_usage_percentage(budget_amount: float, spent_amount: float) -> float:
+        """使用率（%）を計算"""
+        if budget_amount and budget_amount > 0:
+            return (spent_amount or 0.0) / budget_amount * 100
         return 0.0
 
+    @classmethod
+    def over_warning(cls):
+        """警告閾値を超えている有効な予算のクエリセット（使用率はDB側で判定）"""
+        return cls.filter(is_active=True, usage_percentage__gte=F("warning_threshold"))
+
+    @classmethod
+    def over_alert(cls):
+        """アラート閾値を超えている有効な予算のクエリセット（使用率はDB側で判定）"""
+        return cls.filter(is_active=True, usage_percentage__gte=F("alert_threshold"))
+
     @property
     def is_over_warning(self) -> bool:
         """警告閾値を超えているか"""
@@ -339,20 +449,36 @@ class FinanceBudget(BaseModel, TimestampMixin):
         """アラート閾値を超えているか"""
         return self.usage_percentage >= self.alert_threshold
 
+    @classmethod
+    async def apply_delta(cls, category: str, payment_date: date, delta: float):
+        """支払日を含む有効な予算の使用済み金額・残予算を差分で一括更新（1回のUPDATE）"""
+        await cls.filter(
+            category=category,
+            period_start__lte=payment_date,
+            period_end__gte=payment_date,
+            is_active=True
+        ).update(
+            spent_amount=F("spent_amount") + delta,
+            remaining_amount=F("remaining_amount") - delta,
+            usage_percentage=SqlCase(
+                When(budget_amount__gt=0, then=F("usage_percentage") + delta * 100 / F("budget_amount")),
+                default=Value(0.0),
+            ),
+        )
+
     async def update_spent_amount(self):
-        """使用済み金額を再計算"""
-        transactions = await FinanceTransaction.filter(
+        """使用済み金額を再計算（計上条件はbudget_entryと同じ、取引の合計はDB側で集計、差分更新の照合用）"""
+        result = await FinanceTransaction.filter(
             category=self.category,
             transaction_type=FinanceTransactionType.EXPENSE,
             payment_date__gte=self.period_start,
             payment_date__lte=self.period_end,
-            status=FinanceStatus.COMPLETED
-        ).all()
+            status=FinanceStatus.COMPLETED,
+            approval_status=FinanceApprovalStatus.APPROVED
+        ).annotate(total=Sum("amount")).first().values("total")
 
-        total_spent = sum(t.amount for t in transactions)
-        self.spent_amount = total_spent
-        self.remaining_amount = self.budget_amount - total_spent
-        await self.save()
+        self.spent_amount = (result or {}).get("total") or 0.0
+        await self.save(update_fields=["spent_amount", "remaining_amount", "usage_percentage", "updated_at"])
 
 
 class FinanceReport(BaseModel, TimestampMixin):
@@ -403,24 +529,22 @@ class FinanceReport(BaseModel, TimestampMixin):
 
     async def calculate_metrics(self):
         """財務指標を計算"""
-        # 期間内の取引データを取得して分析
-        transactions = await FinanceTransaction.filter(
+        # 期間内の取引の取引種別ごとの合計をDB側で集計
+        rows = await FinanceTransaction.filter(
             payment_date__gte=self.period_start,
             payment_date__lte=self.period_end,
             status=FinanceStatus.COMPLETED
-        ).all()
+        ).annotate(total=Sum("amount")).group_by("transaction_type").values("transaction_type", "total")
+        totals = {row["transaction_type"]: row["total"] or 0.0 for row in rows}
 
-        income_transactions = [t for t in transactions if t.is_income]
-        expense_transactions = [t for t in transactions if t.is_expense]
-
-        self.total_income = sum(t.amount for t in income_transactions)
-        self.total_expense = sum(t.amount for t in expense_transactions)
+        self.total_income = totals.get(FinanceTransactionType.INCOME, 0.0)
+        self.total_expense = totals.get(FinanceTransactionType.EXPENSE, 0.0)
         self.net_profit = self.total_income - self.total_expense
 
         if self.total_income > 0:
             self.profit_margin = (self.net_profit / self.total_income) * 100
 
-        await self.save()
+        await self.save(update_fields=["total_income", "total_expense", "net_profit", "profit_margin", "updated_at"])
 
 
 class ExpenseApplication(BaseModel, TimestampMixin):
@@ -517,10 +641,11 @@ class ExpenseApplication(BaseModel, TimestampMixin):
         if self.status != ApplicationStatus.DRAFT:
             raise ValueError("草稿状態の申請のみ提出可能です")
 
+        now = datetime.now()
         self.status = ApplicationStatus.SUBMITTED
-        self.application_date = datetime.now().date()
-        self.submitted_at = datetime.now()
-        await self.save()
+        self.application_date = now.date()
+        self.submitted_at = now
+        await self.save(update_fields=["status", "application_date", "submitted_at", "updated_at"])
 
         # 承認履歴を記録
         await ExpenseApprovalHistory.create(
@@ -528,7 +653,7 @@ class ExpenseApplication(BaseModel, TimestampMixin):
             action="submit",
             actor=submitted_by or self.applicant_name,
             notes=f"申請を提出しました",
-            action_date=datetime.now()
+            action_date=now
         )
 
     async def approve_application(self, approved_by: str, notes: str = None):
@@ -539,15 +664,17 @@ class ExpenseApplication(BaseModel, TimestampMixin):
         self.status = ApplicationStatus.APPROVED
         self.approved_by = approved_by
         self.approved_at = datetime.now()
-        await self.save()
 
-        # 承認履歴を記録
-        await ExpenseApprovalHistory.create(
-            application=self,
-            action="approve",
-            actor=approved_by,
-            notes=notes or "申請が承認されました",
-            action_date=datetime.now()
+        # 申請の更新と承認履歴の記録は互いに独立しているため並行して実行
+        await asyncio.gather(
+            self.save(update_fields=["status", "approved_by", "approved_at", "updated_at"]),
+            ExpenseApprovalHistory.create(
+                application=self,
+                action="approve",
+                actor=approved_by,
+                notes=notes or "申請が承認されました",
+                action_date=self.approved_at
+            ),
         )
 
         # 財務取引を自動生成
@@ -562,7 +689,7 @@ class ExpenseApplication(BaseModel, TimestampMixin):
         self.approved_by = rejected_by
         self.approved_at = datetime.now()
         self.rejection_reason = reason
-        await self.save()
+        await self.save(update_fields=["status", "approved_by", "approved_at", "rejection_reason", "updated_at"])
 
         # 承認履歴を記録
         await ExpenseApprovalHistory.create(
@@ -570,7 +697,7 @@ class ExpenseApplication(BaseModel, TimestampMixin):
             action="reject",
             actor=rejected_by,
             notes=reason,
-            action_date=datetime.now()
+            action_date=self.approved_at
         )
 
     async def create_finance_transaction(self):
@@ -609,7 +736,7 @@ class ExpenseApplication(BaseModel, TimestampMixin):
 
         # 関連付け
         self.finance_transaction_id = finance_transaction.id
-        await self.save()
+        await self.save(update_fields=["finance_transaction_id", "updated_at"])
 
         return finance_transaction
 
@@ -620,15 +747,22 @@ class ExpenseApplication(BaseModel, TimestampMixin):
 
         self.status = ApplicationStatus.PAID
         self.actual_payment_date = payment_date or date.today()
-        await self.save()
 
-        # 関連する財務取引も更新
-        if self.finance_transaction_id:
-            finance_transaction = await FinanceTransaction.get_or_none(id=self.finance_transaction_id)
-            if finance_transaction:
-                finance_transaction.status = FinanceStatus.COMPLETED
-                finance_transaction.payment_date = self.actual_payment_date
-                await finance_transaction.save()
+        # 申請の更新と関連する財務取引の更新は互いに独立しているため並行して実行
+        await asyncio.gather(
+            self.save(update_fields=["status", "actual_payment_date", "updated_at"]),
+            self._complete_finance_transaction(),
+        )
+
+    async def _complete_finance_transaction(self):
+        """関連する財務取引を支払完了に更新（予算へ反映するためシグナルを発火させる通常のsaveで更新）"""
+        if not self.finance_transaction_id:
+            return
+        finance_transaction = await FinanceTransaction.get_or_none(id=self.finance_transaction_id)
+        if finance_transaction:
+            finance_transaction.status = FinanceStatus.COMPLETED
+            finance_transaction.payment_date = self.actual_payment_date
+            await finance_transaction.save(update_fields=["status", "payment_date", "updated_at"])
 
 
 class ExpenseApprovalHistory(BaseModel, TimestampMixin):
@@ -664,31 +798,80 @@ class ExpenseApprovalHistory(BaseModel, TimestampMixin):
     def __str__(self):
         return f"{self.application.application_number} - {self.action} by {self.actor}"
 
+    @classmethod
+    async def bulk_record(cls, entries: list[dict], batch_size: int = 1000) -> list["ExpenseApprovalHistory"]:
+        """
+        承認履歴を一括登録（データ移行・一括承認用、1件ずつcreateせずまとめてINSERT）
+        返却するインスタンスのIDは採番されない
+        """
+        histories = [cls(**entry) for entry in entries]
+        if histories:
+            await cls.bulk_create(histories, batch_size=batch_size)
+        return histories
+
+
+# 税額の計算に使用する取引の項目
+_TAX_SOURCE_FIELDS = frozenset(("amount", "tax_rate"))
+# 税額の計算結果を保持する取引の項目
+_TAX_FIELDS = ("tax_amount", "tax_exclusive_amount")
+
+# 予算の計上対象・金額に影響する取引の項目
+_BUDGET_ENTRY_FIELDS = frozenset(
+    ("status", "approval_status", "transaction_type", "category", "payment_date", "amount")
+)
+
 
 # Signal handlers
+@pre_save(FinanceTransaction)
+async def transaction_pre_save(sender, instance, using_db, update_fields):
+    """取引保存前の処理（税額の計算と、保存後に差分のみ予算へ反映するための保存前の予算計上内容の保持）"""
+    # 税額・税抜金額は保存時に計算して列に保持（参照時は列の値をそのまま使用）
+    if not update_fields or not _TAX_SOURCE_FIELDS.isdisjoint(update_fields):
+        instance.tax_amount = instance.calculate_tax_amount()
+        instance.tax_exclusive_amount = instance.amount - instance.tax_amount
+
+    instance._budget_entry_before = None
+    if not instance._saved_in_db or (update_fields and _BUDGET_ENTRY_FIELDS.isdisjoint(update_fields)):
+        return
+    before = await FinanceTransaction.filter(id=instance.id).only("id", *_BUDGET_ENTRY_FIELDS).first()
+    if before:
+        instance._budget_entry_before = before.budget_entry()
+
+
+@pre_save(FinanceBudget)
+async def budget_pre_save(sender, instance, using_db, update_fields):
+    """予算保存前に残予算・使用率を予算金額と使用済み金額から再計算"""
+    instance.remaining_amount = (instance.budget_amount or 0.0) - (instance.spent_amount or 0.0)
+    instance.usage_percentage = FinanceBudget.calc_usage_percentage(instance.budget_amount, instance.spent_amount)
+
+
 @post_save(FinanceTransaction)
 async def transaction_post_save(sender, instance, created, using_db, update_fields):
     """取引保存後の処理"""
-    if instance.status == FinanceStatus.COMPLETED and instance.approval_status == FinanceApprovalStatus.APPROVED:
-        # 関連する予算の使用済み金額を更新
-        if instance.payment_date and instance.is_expense:
-            budgets = await FinanceBudget.filter(
-                category=instance.category,
-                period_start__lte=instance.payment_date,
-                period_end__gte=instance.payment_date,
-                is_active=True
-            ).all()
-
-            for budget in budgets:
-                await budget.update_spent_amount()
-
-
-@post_save(ExpenseApplication)
-async def expense_application_post_save(sender, instance, created, using_db, update_fields):
-    """費用申請保存後の処理"""
-    # 申請番号の自動生成
-    if created and not instance.application_number:
-        from datetime import datetime
-        timestamp = datetime.now().strftime('%Y%m%d%H%M%S')
-        instance.application_number = f"EXP-{timestamp}-{instance.id:04d}"
-        await instance.save()
\ No newline at end of file
+    if update_fields and _BUDGET_ENTRY_FIELDS.isdisjoint(update_fields):
+        return
+
+    # 関連する予算の使用済み金額を保存前後の差分で更新
+    before = getattr(instance, "_budget_entry_before", None)
+    after = instance.budget_entry()
+    if before == after:
+        return
+    # 取引の保存に続けて即時反映（差分は再適用できないため、失敗が握りつぶされるレスポンス後の遅延実行は行わない）
+    await _apply_budget_entries(before, after)
+
+
+async def _apply_budget_entries(before, after):
+    """取引の保存前後の予算計上内容（budget_entry）の差分を予算に反映"""
+    if before:
+        category, payment_date, amount = before
+        await FinanceBudget.apply_delta(category, payment_date, -amount)
+    if after:
+        await FinanceBudget.apply_delta(*after)
+
+
+@pre_save(ExpenseApplication)
+async def expense_application_pre_save(sender, instance, using_db, update_fields):
+    """費用申請保存前の処理"""
+    # 申請番号の自動生成（INSERT前に採番するため追加のUPDATEは不要、同時刻の申請でも重複しないようUUIDを使用）
+    if not instance.application_number:
+        instance.application_number = f"EXP-{datetime.now():%Y%m%d}-{uuid.uuid4().hex[:10]}"
\ No newline at end of file
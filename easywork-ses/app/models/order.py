@@ -19,6 +19,8 @@ class Order(BaseModel, TimestampMixin):
     - 契約詳細: contract (契約期間、工時、単価等)
     - 担当営業: case.company_sales_representative (自社営業)
     - 基本給: contract.calculation_items (BASIC_SALARY)
+
+    BP会社・担当営業・基本給は送信時にスナップショットとして保存し、以降はJOINせずに参照する
     """
 
     # 基本情報
@@ -30,6 +32,15 @@ class Order(BaseModel, TimestampMixin):
     case = fields.ForeignKeyField("models.Case", related_name="orders", description="案件")
     contract = fields.ForeignKeyField("models.Contract", related_name="orders", description="契約")
 
+    # 発行時点の関連情報スナップショット（注文書詳細・文書生成でJOINせずに参照）
+    bp_company_id = fields.BigIntField(null=True, description="BP会社ID（スナップショット）")
+    bp_company_name_snapshot = fields.CharField(max_length=255, null=True, description="BP会社名（スナップショット）")
+    sales_representative_id = fields.BigIntField(null=True, description="担当営業ID（スナップショット）")
+    sales_representative_name_snapshot = fields.CharField(
+        max_length=100, null=True, description="担当営業名（スナップショット）"
+    )
+    basic_salary_snapshot = fields.FloatField(null=True, description="基本給（スナップショット）")
+
     # 文書管理
     order_document_url = fields.CharField(max_length=500, null=True, description="注文書PDF URL")
     order_request_url = fields.CharField(max_length=500, null=True, description="注文請書PDF URL")
@@ -53,7 +64,11 @@ class Order(BaseModel, TimestampMixin):
         indexes = [
             ("personnel", "year_month"),
             ("status",),
-            ("year_month",),
+            # 月度×ステータスでの絞り込み（月次バッチ・完了状況集計）、年月のみの検索も先頭列で対応
+            ("year_month", "status"),
+            # 案件別の月度注文書検索
+            ("case", "year_month"),
+            ("bp_company_id",),
             ("order_number",),
         ]
         # 同一要員同一月不能重复注文书
@@ -79,7 +94,8 @@ class Order(BaseModel, TimestampMixin):
         return self.year_month
 
     async def mark_as_sent(self, sent_by: str = None):
-        """送信済みマーク"""
+        """送信済みマーク（送信時点の関連情報をスナップショットとして保存）"""
+        await self.take_snapshot()
         self.sent_date = datetime.now()
         self.sent_by = sent_by
         self.status = OrderStatus.SENT
@@ -91,50 +107,92 @@ class Order(BaseModel, TimestampMixin):
         self.status = OrderStatus.COLLECTED
         await self.save()
 
+    # 注文書詳細に必要な関連データ（1回のfetch_relatedでまとめて取得する）
+    DETAIL_RELATIONS = (
+        "personnel__bp_employee_detail__bp_company",
+        "case__company_sales_representative",
+        "contract__calculation_items",
+    )
+
+    def _details_loaded(self) -> bool:
+        """注文書詳細の関連データが取得済みか（一覧でprefetch_related済みの場合など）"""
+        personnel = self._loaded_relation("personnel")
+        case = self._loaded_relation("case")
+        contract = self._loaded_relation("contract")
+        return (
+            personnel is not None
+            and "_bp_employee_detail" in personnel.__dict__
+            and case is not None
+            and "_company_sales_representative" in case.__dict__
+            and contract is not None
+            and contract.calculation_items._fetched
+        )
+
+    async def load_details(self):
+        """注文書詳細の関連データを未取得の場合のみまとめて取得"""
+        if not self._details_loaded():
+            await self.fetch_related(*self.DETAIL_RELATIONS)
+
     async def get_bp_company(self):
         """BP会社取得"""
-        await self.fetch_related("personnel__bp_employee_detail__bp_company")
-        personnel = self.personnel
-        if personnel and hasattr(personnel, "bp_employee_detail") and personnel.bp_employee_detail:
-            return await personnel.bp_employee_detail.bp_company
-        return None
+        await self.load_details()
+        detail = self.personnel.bp_employee_detail
+        return detail.bp_company if detail else None
 
     async def get_sales_representative(self):
         """担当営業取得"""
-        await self.fetch_related("case__company_sales_representative")
-        case = self.case
-        return case.company_sales_representative if case else None
+        await self.load_details()
+        return self.case.company_sales_representative
 
     async def get_basic_salary(self) -> float:
         """基本給取得"""
-        await self.fetch_related("contract__calculation_items")
-        contract = self.contract
-        if not contract:
-            return 0.0
+        await self.load_details()
+        for item in self.contract.calculation_items:
+            if item.item_type == ContractItemType.BASIC_SALARY and item.is_active:
+                return float(item.amount)
+        return 0.0
 
-        basic_salary_item = await contract.calculation_items.filter(
-            item_type=ContractItemType.BASIC_SALARY.value, is_active=True
-        ).first()
+    @property
+    def has_snapshot(self) -> bool:
+        """関連情報のスナップショットを保存済みか（基本給は常に設定されるため判定に使用）"""
+        return self.basic_salary_snapshot is not None
 
-        return float(basic_salary_item.amount) if basic_salary_item else 0.0
+    async def take_snapshot(self):
+        """BP会社・担当営業・基本給を関連データから取得してスナップショットに設定（保存は呼び出し側）"""
+        bp_company = await self.get_bp_company()
+        sales_rep = await self.get_sales_representative()
+        self.bp_company_id = bp_company.id if bp_company else None
+        self.bp_company_name_snapshot = bp_company.name if bp_company else None
+        self.sales_representative_id = sales_rep.id if sales_rep else None
+        self.sales_representative_name_snapshot = sales_rep.name if sales_rep else None
+        self.basic_salary_snapshot = await self.get_basic_salary()
 
     async def get_full_details(self) -> dict:
         """
         注文書作成に必要な全ての詳細情報を取得
+        スナップショット保存済みの場合はBP会社・担当営業・精算項目を取得しない
         """
-        # 関連データを効率的に取得
-        await self.fetch_related(
-            "personnel__bp_employee_detail__bp_company",
-            "case__company_sales_representative",
-            "contract__calculation_items",
-        )
+        if self.has_snapshot:
+            missing = [field for field in ("personnel", "case", "contract") if self._loaded_relation(field) is None]
+            if missing:
+                await self.fetch_related(*missing)
+            bp_company_id = self.bp_company_id
+            bp_company_name = self.bp_company_name_snapshot
+            sales_rep_name = self.sales_representative_name_snapshot
+            basic_salary = self.basic_salary_snapshot
+        else:
+            # 関連データを1回でまとめて取得し、以降は取得済みのデータを参照する
+            await self.load_details()
+            bp_company = await self.get_bp_company()
+            sales_rep = await self.get_sales_representative()
+            bp_company_id = bp_company.id if bp_company else None
+            bp_company_name = bp_company.name if bp_company else None
+            sales_rep_name = sales_rep.name if sales_rep else None
+            basic_salary = await self.get_basic_salary()
 
         personnel = self.personnel
         case = self.case
         contract = self.contract
-        bp_company = await self.get_bp_company()
-        sales_rep = await self.get_sales_representative()
-        basic_salary = await self.get_basic_salary()
 
         return {
             # 基本情報
@@ -142,11 +200,11 @@ class Order(BaseModel, TimestampMixin):
             "year_month": self.year_month,
             "year_month_display": self.get_year_month_display(),
             # 関連情報
-            "bp_company_name": bp_company.name if bp_company else "",
-            "bp_company_id": bp_company.id,
+            "bp_company_name": bp_company_name or "",
+            "bp_company_id": bp_company_id,
             "personnel_name": personnel.name if personnel else "",
             "case_title": case.title if case else "",
-            "sales_representative_name": sales_rep.name if sales_rep else "",
+            "sales_representative_name": sales_rep_name or "",
             # 契約詳細
             "contract_details": {
                 "contract_number": contract.contract_number if contract else "",
@@ -226,11 +284,10 @@ class OrderBatch(BaseModel, TimestampMixin):
         return (self.sent_orders / self.total_orders) * 100
 
     async def update_counts(self):
-        """件数更新"""
-        orders = await self.orders.all()
-        self.total_orders = len(orders)
-        self.sent_orders = len([o for o in orders if o.is_sent])
-        await self.save()
+        """件数更新（注文書を読み込まずDB側で件数を集計）"""
+        self.total_orders = await self.orders.all().count()
+        self.sent_orders = await self.orders.filter(status__in=[OrderStatus.SENT, OrderStatus.COLLECTED]).count()
+        await self.save(update_fields=["total_orders", "sent_orders", "updated_at"])
 
     async def mark_as_processed(self, processed_by: str):
         """処理完了マーク"""
@@ -1,6 +1,9 @@
+from datetime import timedelta
+from typing import ClassVar
+
 from tortoise import fields
 
-from app.models.base import BaseModel, TimestampMixin
+from app.models.base import BaseModel, TimestampMixin, today_cached
 from app.models.enums import (
     DecimalProcessingType,
     EmployeeType,
@@ -109,23 +112,22 @@ class Personnel(BaseModel, TimestampMixin):
             ("is_active", "person_type"),
         ]
 
+    # 案件候補者の氏名・タイプのスナップショットへの同期要否の判定に使用
+    TRACKED_FIELDS: ClassVar[tuple[str, ...]] = ("name", "person_type")
+
     @property
     def current_age(self) -> int:
         if not self.birthday:
             return self.age or 0
 
-        from datetime import date
-
-        today = date.today()
+        today = today_cached()
         return today.year - self.birthday.year - ((today.month, today.day) < (self.birthday.month, self.birthday.day))
 
     def is_visa_expiring_soon(self, days: int = 90) -> bool:
         if not self.visa_expire_date:
             return False
 
-        from datetime import date, timedelta
-
-        return self.visa_expire_date <= date.today() + timedelta(days=days)
+        return self.visa_expire_date <= today_cached() + timedelta(days=days)
 
     async def get_detail(self):
         if self.person_type == PersonType.EMPLOYEE:
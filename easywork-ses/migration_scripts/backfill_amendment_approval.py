@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+契約修正書（ses_contract_amendment）の全当事者承認済みフラグ（is_fully_approved）追加とデータ補完
+
+- is_fully_approved 列と (original_contract_id, is_fully_approved) インデックスが無ければ追加
+- 既存レコードのフラグを client_approved / company_approved / personnel_acknowledged から設定
+  （以降は保存時に pre_save で更新される）
+"""
+
+import asyncio
+import os
+import sys
+from datetime import datetime
+
+from tortoise import Tortoise
+
+# プロジェクトパスを追加
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.settings.config import settings
+
+TABLE = "ses_contract_amendment"
+
+
+class AmendmentApprovalBackfiller:
+    """修正書の承認済みフラグ補完クラス"""
+
+    def __init__(self):
+        self.settings = settings
+        self.db = None
+
+    def log(self, message: str, level: str = "INFO"):
+        """ログ出力"""
+        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        print(f"[{timestamp}] {level}: {message}")
+
+    async def init_db(self):
+        """データベース接続初期化"""
+        await Tortoise.init(config=self.settings.TORTOISE_ORM)
+        self.db = Tortoise.get_connection("mysql")
+        self.log("データベース接続を初期化しました")
+
+    async def close_db(self):
+        """データベース接続終了"""
+        await Tortoise.close_connections()
+        self.log("データベース接続を終了しました")
+
+    async def add_column(self):
+        """is_fully_approved 列・インデックスを追加（既に存在する場合はスキップ）"""
+        rows = await self.db.execute_query_dict(
+            "SELECT COUNT(*) AS cnt FROM information_schema.COLUMNS "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND COLUMN_NAME = 'is_fully_approved'",
+            [TABLE],
+        )
+        if rows[0]["cnt"]:
+            self.log("is_fully_approved 列は既に存在します")
+            return
+
+        await self.db.execute_script(
+            f"ALTER TABLE `{TABLE}` "
+            "ADD COLUMN `is_fully_approved` BOOL NOT NULL DEFAULT 0 COMMENT '全当事者承認済み', "
+            "ADD INDEX `idx_ses_contract_amendment_contract_approved` (`original_contract_id`, `is_fully_approved`)"
+        )
+        self.log("is_fully_approved 列を追加しました")
+
+    async def backfill(self):
+        """3当事者の承認状態からフラグを設定（値が異なる行のみ更新）"""
+        updated = await self.db.execute_query(
+            f"UPDATE `{TABLE}` "
+            "SET is_fully_approved = (client_approved AND company_approved AND personnel_acknowledged) "
+            "WHERE is_fully_approved <> (client_approved AND company_approved AND personnel_acknowledged)"
+        )
+        self.log(f"is_fully_approved を補完しました: {updated[0]} 件")
+
+
+async def main():
+    backfiller = AmendmentApprovalBackfiller()
+    try:
+        await backfiller.init_db()
+        await backfiller.add_column()
+        await backfiller.backfill()
+    finally:
+        await backfiller.close_db()
+
+
+if __name__ == "__main__":
+    print("=== ses_contract_amendment is_fully_approved 補完 ===")
+    confirm = input("テーブル構造を変更します。続行しますか? (y/N): ")
+    if confirm.lower() != "y":
+        print("操作をキャンセルしました")
+        sys.exit(0)
+
+    asyncio.run(main())
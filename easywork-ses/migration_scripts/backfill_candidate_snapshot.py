@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+案件候補者（ses_case_candidate）の候補者名・タイプのスナップショット補完
+
+- candidate_name_cached / candidate_type_cached が空の既存レコードに ses_personnel の氏名・タイプを設定
+  （以降は候補者保存時の pre_save と人材保存時の post_save で同期される）
+"""
+
+import asyncio
+import os
+import sys
+from datetime import datetime
+
+from tortoise import Tortoise
+
+# プロジェクトパスを追加
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.models.case import _CANDIDATE_TYPE_LABELS
+from app.settings.config import settings
+
+TABLE = "ses_case_candidate"
+
+
+class CandidateSnapshotBackfiller:
+    """候補者名・タイプのスナップショット補完クラス"""
+
+    def __init__(self):
+        self.settings = settings
+        self.db = None
+
+    def log(self, message: str, level: str = "INFO"):
+        """ログ出力"""
+        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        print(f"[{timestamp}] {level}: {message}")
+
+    async def init_db(self):
+        """データベース接続初期化"""
+        await Tortoise.init(config=self.settings.TORTOISE_ORM)
+        self.db = Tortoise.get_connection("mysql")
+        self.log("データベース接続を初期化しました")
+
+    async def close_db(self):
+        """データベース接続終了"""
+        await Tortoise.close_connections()
+        self.log("データベース接続を終了しました")
+
+    async def backfill(self):
+        """スナップショットが空の候補者に人材の氏名・タイプ表示名を設定"""
+        type_cases = " ".join("WHEN %s THEN %s" for _ in _CANDIDATE_TYPE_LABELS)
+        params = [
+            value for person_type, label in _CANDIDATE_TYPE_LABELS.items() for value in (person_type.value, label)
+        ]
+        updated = await self.db.execute_query(
+            f"UPDATE `{TABLE}` c JOIN `ses_personnel` p ON p.id = c.personnel_id "
+            f"SET c.candidate_name_cached = p.name, "
+            f"c.candidate_type_cached = CASE p.person_type {type_cases} ELSE '不明' END "
+            "WHERE c.candidate_name_cached IS NULL OR c.candidate_type_cached IS NULL",
+            params,
+        )
+        self.log(f"候補者名・タイプを補完しました: {updated[0]} 件")
+
+        rows = await self.db.execute_query_dict(
+            f"SELECT COUNT(*) AS cnt FROM `{TABLE}` " "WHERE personnel_id IS NOT NULL AND candidate_name_cached IS NULL"
+        )
+        if rows[0]["cnt"]:
+            self.log(f"スナップショットが未設定の候補者: {rows[0]['cnt']} 件", "WARNING")
+
+
+async def main():
+    backfiller = CandidateSnapshotBackfiller()
+    try:
+        await backfiller.init_db()
+        await backfiller.backfill()
+    finally:
+        await backfiller.close_db()
+
+
+if __name__ == "__main__":
+    print("=== ses_case_candidate 候補者名・タイプ補完 ===")
+    confirm = input("データを更新します。続行しますか? (y/N): ")
+    if confirm.lower() != "y":
+        print("操作をキャンセルしました")
+        sys.exit(0)
+
+    asyncio.run(main())
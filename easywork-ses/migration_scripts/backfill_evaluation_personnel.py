@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+人材評価（ses_person_evaluation）への評価対象人材外部キー（personnel_id）追加とデータ補完
+
+- personnel_id 列・インデックス・外部キーが無ければ追加
+- 既存レコードの (person_type, person_id) から ses_personnel を突き合わせて personnel_id を設定
+  （person_type, person_id は移行・監査用にそのまま保持する）
+"""
+
+import asyncio
+import os
+import sys
+from datetime import datetime
+
+from tortoise import Tortoise
+
+# プロジェクトパスを追加
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.settings.config import settings
+
+TABLE = "ses_person_evaluation"
+
+
+class EvaluationPersonnelBackfiller:
+    """人材評価の外部キー補完クラス"""
+
+    def __init__(self):
+        self.settings = settings
+        self.db = None
+
+    def log(self, message: str, level: str = "INFO"):
+        """ログ出力"""
+        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        print(f"[{timestamp}] {level}: {message}")
+
+    async def init_db(self):
+        """データベース接続初期化"""
+        await Tortoise.init(config=self.settings.TORTOISE_ORM)
+        self.db = Tortoise.get_connection("mysql")
+        self.log("データベース接続を初期化しました")
+
+    async def close_db(self):
+        """データベース接続終了"""
+        await Tortoise.close_connections()
+        self.log("データベース接続を終了しました")
+
+    async def add_column(self):
+        """personnel_id 列・インデックス・外部キーを追加（既に存在する場合はスキップ）"""
+        rows = await self.db.execute_query_dict(
+            "SELECT COUNT(*) AS cnt FROM information_schema.COLUMNS "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND COLUMN_NAME = 'personnel_id'",
+            [TABLE],
+        )
+        if rows[0]["cnt"]:
+            self.log("personnel_id 列は既に存在します")
+            return
+
+        await self.db.execute_script(
+            f"ALTER TABLE `{TABLE}` "
+            "ADD COLUMN `personnel_id` BIGINT NULL COMMENT '評価対象人材', "
+            "ADD INDEX `idx_ses_person_evaluation_personnel_id` (`personnel_id`), "
+            "ADD CONSTRAINT `fk_ses_pers_ses_pers_personnel` FOREIGN KEY (`personnel_id`) "
+            "REFERENCES `ses_personnel` (`id`) ON DELETE SET NULL"
+        )
+        self.log("personnel_id 列を追加しました")
+
+    async def backfill(self):
+        """(person_type, person_id) が一致する人材の ID を personnel_id に設定"""
+        updated = await self.db.execute_query(
+            f"UPDATE `{TABLE}` e JOIN `ses_personnel` p "
+            "ON p.id = e.person_id AND p.person_type = e.person_type "
+            "SET e.personnel_id = p.id WHERE e.personnel_id IS NULL"
+        )
+        self.log(f"personnel_id を補完しました: {updated[0]} 件")
+
+        rows = await self.db.execute_query_dict(f"SELECT COUNT(*) AS cnt FROM `{TABLE}` WHERE personnel_id IS NULL")
+        if rows[0]["cnt"]:
+            self.log(f"対応する人材が見つからない評価: {rows[0]['cnt']} 件", "WARNING")
+
+
+async def main():
+    backfiller = EvaluationPersonnelBackfiller()
+    try:
+        await backfiller.init_db()
+        await backfiller.add_column()
+        await backfiller.backfill()
+    finally:
+        await backfiller.close_db()
+
+
+if __name__ == "__main__":
+    print("=== ses_person_evaluation personnel_id 補完 ===")
+    confirm = input("テーブル構造を変更します。続行しますか? (y/N): ")
+    if confirm.lower() != "y":
+        print("操作をキャンセルしました")
+        sys.exit(0)
+
+    asyncio.run(main())
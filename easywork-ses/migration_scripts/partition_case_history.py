@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+案件変更履歴テーブル（ses_case_history）の月次レンジパーティション化
+
+- 初回実行: created_at の月単位で PARTITION BY RANGE (TO_DAYS(created_at)) に変換
+- 定期実行（--maintain）: 翌月以降のパーティションを事前作成し、保持期間を過ぎたパーティションを削除
+
+MySQLのパーティションテーブルは外部キーを持てず、全ての一意キーにパーティション列を含める必要があるため、
+case_id の外部キー制約を外し、主キーを (id, created_at) に変更する。
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+from datetime import date, datetime
+
+from tortoise import Tortoise
+
+# プロジェクトパスを追加
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.settings.config import settings
+
+TABLE = "ses_case_history"
+# 事前に作成しておく将来月数
+FUTURE_MONTHS = 3
+
+
+def add_months(d: date, months: int) -> date:
+    """月初日に月数を加算"""
+    month_index = d.year * 12 + d.month - 1 + months
+    return date(month_index // 12, month_index % 12 + 1, 1)
+
+
+def partition_name(month_start: date) -> str:
+    return f"p{month_start:%Y%m}"
+
+
+def partition_clause(month_start: date) -> str:
+    """month_start の月を格納するパーティション定義（上限は翌月初日）"""
+    upper = add_months(month_start, 1)
+    return f"PARTITION {partition_name(month_start)} VALUES LESS THAN (TO_DAYS('{upper.isoformat()}'))"
+
+
+class CaseHistoryPartitioner:
+    """案件変更履歴パーティション管理クラス"""
+
+    def __init__(self):
+        self.settings = settings
+        self.db = None
+
+    def log(self, message: str, level: str = "INFO"):
+        """ログ出力"""
+        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        print(f"[{timestamp}] {level}: {message}")
+
+    async def init_db(self):
+        """データベース接続初期化"""
+        await Tortoise.init(config=self.settings.TORTOISE_ORM)
+        self.db = Tortoise.get_connection("mysql")
+        self.log("データベース接続を初期化しました")
+
+    async def close_db(self):
+        """データベース接続終了"""
+        await Tortoise.close_connections()
+        self.log("データベース接続を終了しました")
+
+    async def get_partitions(self) -> list[str]:
+        """既存パーティション名一覧（pmaxを含む）"""
+        rows = await self.db.execute_query_dict(
+            "SELECT PARTITION_NAME AS name FROM information_schema.PARTITIONS "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND PARTITION_NAME IS NOT NULL "
+            "ORDER BY PARTITION_ORDINAL_POSITION",
+            [TABLE],
+        )
+        return [row["name"] for row in rows]
+
+    async def drop_foreign_keys(self):
+        """パーティションテーブルでは外部キーが使えないため削除"""
+        rows = await self.db.execute_query_dict(
+            "SELECT CONSTRAINT_NAME AS name FROM information_schema.TABLE_CONSTRAINTS "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND CONSTRAINT_TYPE = 'FOREIGN KEY'",
+            [TABLE],
+        )
+        for row in rows:
+            await self.db.execute_script(f"ALTER TABLE `{TABLE}` DROP FOREIGN KEY `{row['name']}`")
+            self.log(f"外部キーを削除しました: {row['name']}")
+
+    async def partition_table(self):
+        """テーブルを月次レンジパーティションに変換"""
+        if await self.get_partitions():
+            self.log("既にパーティション化されています。メンテナンスのみ実行します")
+            await self.maintain()
+            return
+
+        await self.drop_foreign_keys()
+        await self.db.execute_script(f"ALTER TABLE `{TABLE}` DROP PRIMARY KEY, ADD PRIMARY KEY (`id`, `created_at`)")
+        self.log("主キーを (id, created_at) に変更しました")
+
+        rows = await self.db.execute_query_dict(f"SELECT MIN(created_at) AS oldest FROM `{TABLE}`")
+        today = date.today().replace(day=1)
+        oldest = rows[0]["oldest"].date().replace(day=1) if rows and rows[0]["oldest"] else today
+
+        clauses = []
+        month = oldest
+        while month <= add_months(today, FUTURE_MONTHS):
+            clauses.append(partition_clause(month))
+            month = add_months(month, 1)
+        clauses.append("PARTITION pmax VALUES LESS THAN MAXVALUE")
+
+        await self.db.execute_script(
+            f"ALTER TABLE `{TABLE}` PARTITION BY RANGE (TO_DAYS(`created_at`)) ({', '.join(clauses)})"
+        )
+        self.log(f"パーティション化が完了しました: {len(clauses)} パーティション")
+
+    async def maintain(self, retention_months: int | None = None):
+        """将来月のパーティションを追加し、保持期間外のパーティションを削除"""
+        partitions = await self.get_partitions()
+        if not partitions:
+            self.log("パーティション化されていません。先に初回実行してください", "ERROR")
+            return
+
+        today = date.today().replace(day=1)
+        new_clauses = []
+        month = today
+        while month <= add_months(today, FUTURE_MONTHS):
+            if partition_name(month) not in partitions:
+                new_clauses.append(partition_clause(month))
+            month = add_months(month, 1)
+
+        if new_clauses:
+            # pmax を分割して新しい月のパーティションを作成（pmaxは空のため即時に完了）
+            new_clauses.append("PARTITION pmax VALUES LESS THAN MAXVALUE")
+            await self.db.execute_script(
+                f"ALTER TABLE `{TABLE}` REORGANIZE PARTITION pmax INTO ({', '.join(new_clauses)})"
+            )
+            self.log(f"パーティションを追加しました: {len(new_clauses) - 1} 件")
+
+        if retention_months:
+            cutoff = partition_name(add_months(today, -retention_months))
+            expired = [name for name in partitions if name != "pmax" and name < cutoff]
+            if expired:
+                await self.db.execute_script(f"ALTER TABLE `{TABLE}` DROP PARTITION {', '.join(expired)}")
+                self.log(f"保持期間外のパーティションを削除しました: {', '.join(expired)}")
+
+
+async def main(args):
+    partitioner = CaseHistoryPartitioner()
+    try:
+        await partitioner.init_db()
+        if args.maintain:
+            await partitioner.maintain(retention_months=args.retention_months)
+        else:
+            await partitioner.partition_table()
+    finally:
+        await partitioner.close_db()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="ses_case_history 月次パーティション管理")
+    parser.add_argument("--maintain", action="store_true", help="定期メンテナンス（cronで月次実行）")
+    parser.add_argument(
+        "--retention-months", type=int, default=None, help="保持月数（指定時のみ古いパーティションを削除）"
+    )
+    args = parser.parse_args()
+
+    if not args.maintain:
+        print("=== ses_case_history パーティション化 ===")
+        confirm = input("テーブル構造を変更します。続行しますか? (y/N): ")
+        if confirm.lower() != "y":
+            print("操作をキャンセルしました")
+            sys.exit(0)
+
+    asyncio.run(main(args))
@@ -66,3 +66,49 @@ async def test_case_candidate_creation(db):
     assert candidate.case_id == case.id
     assert candidate.status == CandidateStatus.PENDING
     assert candidate.proposed_unit_price == 550000
+
+
+@pytest.mark.asyncio
+async def test_case_candidate_snapshot_sync(db):
+    """候補者名・タイプのスナップショットが人材・候補者の変更時のみ同期されること"""
+    from app.models.client import ClientCompany
+    from app.models.enums import EmploymentStatus, PersonType
+    from app.models.personnel import Personnel
+
+    client_company = await ClientCompany.create(company_name="スナップショット顧客")
+    case = await Case.create(title="スナップショット案件", client_company=client_company)
+    personnel = await Personnel.create(name="山田太郎", person_type=PersonType.FREELANCER)
+    other = await Personnel.create(name="佐藤花子", person_type=PersonType.EMPLOYEE)
+
+    candidate = await CaseCandidate.create(case=case, personnel=personnel)
+    candidate = await CaseCandidate.full_query().get(id=candidate.id)
+    assert (candidate.candidate_name, candidate.candidate_type) == ("山田太郎", "フリーランス")
+    assert candidate.client_company_id == client_company.id
+
+    # 氏名・タイプが変わらない人材の保存では候補者を更新しない
+    await CaseCandidate.filter(id=candidate.id).update(candidate_name_cached="旧氏名")
+    personnel = await Personnel.get(id=personnel.id)
+    personnel.employment_status = EmploymentStatus.WORKING
+    await personnel.save()
+    await candidate.refresh_from_db()
+    assert candidate.candidate_name == "旧氏名"
+
+    # 氏名変更は全項目保存でも候補者に反映される
+    personnel.name = "山田次郎"
+    await personnel.save()
+    await candidate.refresh_from_db()
+    assert candidate.candidate_name == "山田次郎"
+
+    # 案件・人材が変わらない候補者の保存ではスナップショットを再取得しない
+    await Personnel.filter(id=personnel.id).update(name="直接更新")
+    candidate = await CaseCandidate.get(id=candidate.id)
+    candidate.status = CandidateStatus.INTERVIEWED
+    await candidate.save()
+    await candidate.refresh_from_db()
+    assert candidate.candidate_name == "山田次郎"
+
+    # 人材の変更時は再取得される
+    candidate.personnel_id = other.id
+    await candidate.save()
+    await candidate.refresh_from_db()
+    assert (candidate.candidate_name, candidate.candidate_type) == ("佐藤花子", "自社社員")
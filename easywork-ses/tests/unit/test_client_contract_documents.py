@@ -0,0 +1,68 @@
+from datetime import date
+
+import pytest
+
+from app.models.client import ClientCompany, ClientCompanyContract, ClientContractDocument
+from app.models.enums import SESContractForm
+
+LEGACY_DOCUMENT = {
+    "file_name": "旧契約書.pdf",
+    "file_path": "/uploads/legacy.pdf",
+    "file_size": 100,
+    "upload_date": "2024-01-01T00:00:00",
+}
+
+
+async def create_contract(contract_documents: list | None = None) -> ClientCompanyContract:
+    client_company = await ClientCompany.create(company_name="書類テスト顧客")
+    return await ClientCompanyContract.create(
+        client_company=client_company,
+        contract_number="CC-001",
+        contract_name="基本契約",
+        contract_form=SESContractForm.GYOMU_ITAKU,
+        contract_start_date=date(2024, 1, 1),
+        contract_documents=contract_documents or [],
+    )
+
+
+@pytest.mark.asyncio
+async def test_contract_documents_merge_legacy_json_and_rows(db):
+    """旧形式のJSONの書類が先頭、書類テーブルの行が登録順で続くこと（prefetch有無で同じ結果）"""
+    contract = await create_contract([LEGACY_DOCUMENT])
+    await contract.add_contract_document("契約書.pdf", "/uploads/contract.pdf", 200, "2024-02-01T00:00:00")
+    await contract.add_contract_document("覚書.pdf", "/uploads/memo.pdf")
+
+    expected_names = ["旧契約書.pdf", "契約書.pdf", "覚書.pdf"]
+    documents = await contract.get_contract_documents()
+    assert [doc["file_name"] for doc in documents] == expected_names
+    assert documents[0] == LEGACY_DOCUMENT
+    assert documents[1] == {
+        "file_name": "契約書.pdf",
+        "file_path": "/uploads/contract.pdf",
+        "file_size": 200,
+        "upload_date": "2024-02-01T00:00:00",
+    }
+    # 書類追加では契約本体のJSONを書き換えない
+    await contract.refresh_from_db()
+    assert contract.contract_documents == [LEGACY_DOCUMENT]
+
+    prefetched = await ClientCompanyContract.filter(id=contract.id).prefetch_related("documents").first()
+    assert await prefetched.get_contract_documents() == documents
+
+
+@pytest.mark.asyncio
+async def test_replace_contract_documents_clears_legacy_json(db):
+    """書類一覧の置き換えで旧形式のJSONが空になり、書類テーブルの行のみになること"""
+    contract = await create_contract([LEGACY_DOCUMENT])
+    await contract.add_contract_document("契約書.pdf", "/uploads/contract.pdf")
+
+    await contract.replace_contract_documents(
+        [LEGACY_DOCUMENT, {"file_name": "新.pdf", "file_path": "/uploads/new.pdf"}]
+    )
+
+    contract = await ClientCompanyContract.get(id=contract.id)
+    assert contract.contract_documents == []
+    documents = await contract.get_contract_documents()
+    assert [doc["file_name"] for doc in documents] == ["旧契約書.pdf", "新.pdf"]
+    assert documents[1]["upload_date"] is not None
+    assert await ClientContractDocument.filter(contract_id=contract.id).count() == 2
@@ -0,0 +1,148 @@
+from datetime import date
+
+import numpy as np
+import pytest
+
+from app.models._contract_kernels import (
+    HAS_NUMBA,
+    _build_payment_kernel,
+    _compute_payments_parallel,
+    compute_payment,
+    compute_payments_batch,
+    compute_payments_vec,
+    payment_kernel,
+)
+from app.models.case import Case
+from app.models.client import ClientCompany
+from app.models.contract import Contract, ContractCalculationItem
+from app.models.enums import ContractItemType, ContractType, PaymentUnit
+
+# 上限・下限時間の組み合わせ（Noneは未設定）
+SHAPES = [(None, None), (180.0, None), (None, 140.0), (180.0, 140.0)]
+ACTUAL_HOURS = [100.0, 139.5, 140.0, 160.0, 180.0, 185.0, 200.0]
+FREE_OVERTIME_HOURS = [0.0, 10.0]
+
+BASE_SALARY = 600000.0
+STD_HOURS = 160.0
+OVERTIME_RATE = 1.25
+SHORTAGE_RATE = 0.9
+
+# 精算結果の金額項目
+AMOUNT_KEYS = (
+    "base_salary",
+    "overtime_payment",
+    "shortage_deduction",
+    "allowances",
+    "other_deductions",
+    "total_payment",
+)
+
+# numba環境ではJIT前の純Python関数を基準にする
+reference_payment = compute_payment.py_func if HAS_NUMBA else compute_payment
+
+
+def _reference(max_h, min_h, free_ot, actual):
+    return reference_payment(
+        BASE_SALARY,
+        STD_HOURS,
+        max_h or -1.0,
+        min_h or -1.0,
+        free_ot,
+        OVERTIME_RATE,
+        SHORTAGE_RATE,
+        actual,
+    )
+
+
+def _cases():
+    return [
+        (max_h, min_h, free_ot, actual)
+        for max_h, min_h in SHAPES
+        for free_ot in FREE_OVERTIME_HOURS
+        for actual in ACTUAL_HOURS
+    ]
+
+
+def _batch_columns(cases):
+    """一括計算用の列配列（上限・下限の未設定はNaN）"""
+    return (
+        np.full(len(cases), BASE_SALARY),
+        np.full(len(cases), STD_HOURS),
+        np.array([max_h or np.nan for max_h, _, _, _ in cases]),
+        np.array([min_h or np.nan for _, min_h, _, _ in cases]),
+        np.array([free_ot for _, _, free_ot, _ in cases]),
+        np.full(len(cases), OVERTIME_RATE),
+        np.full(len(cases), SHORTAGE_RATE),
+        np.array([actual for _, _, _, actual in cases]),
+    )
+
+
+@pytest.mark.parametrize("max_h, min_h, free_ot, actual", _cases())
+def test_scalar_kernels_match_reference(max_h, min_h, free_ot, actual):
+    """上限・下限の有無ごとの生成カーネル・JITカーネルが基準の計算と一致すること"""
+    expected = _reference(max_h, min_h, free_ot, actual)
+    args = (BASE_SALARY, STD_HOURS, max_h or -1.0, min_h or -1.0, free_ot, OVERTIME_RATE, SHORTAGE_RATE, actual)
+
+    assert _build_payment_kernel(max_h is not None, min_h is not None)(*args) == pytest.approx(expected)
+    assert payment_kernel(max_h or -1.0, min_h or -1.0)(*args) == pytest.approx(expected)
+    assert compute_payment(*args) == pytest.approx(expected)
+
+
+@pytest.mark.parametrize("batch", [compute_payments_vec, compute_payments_batch])
+def test_batch_kernels_match_reference(batch):
+    """配列一括計算（NumPy・numba並列）が契約ごとの基準の計算と一致すること"""
+    cases = _cases()
+    results = batch(*_batch_columns(cases))
+
+    for i, (max_h, min_h, free_ot, actual) in enumerate(cases):
+        assert tuple(float(column[i]) for column in results) == pytest.approx(_reference(max_h, min_h, free_ot, actual))
+
+
+@pytest.mark.skipif(not HAS_NUMBA, reason="numba未インストール")
+def test_parallel_kernel_matches_vectorized():
+    """numba並列ループとNumPyベクトル演算の結果が一致すること"""
+    columns = _batch_columns(_cases())
+    for parallel, vectorized in zip(_compute_payments_parallel(*columns), compute_payments_vec(*columns)):
+        np.testing.assert_allclose(parallel, vectorized)
+
+
+@pytest.mark.asyncio
+async def test_bulk_payment_matches_single_contract_calculation(db):
+    """calculate_monthly_payments_bulkと契約単位のcalculate_monthly_paymentの精算結果が一致すること"""
+    client_company = await ClientCompany.create(company_name="精算テスト顧客")
+    case = await Case.create(title="精算テスト案件", client_company=client_company)
+
+    contracts = []
+    for i, (max_h, min_h) in enumerate(SHAPES):
+        contract = await Contract.create(
+            contract_number=f"PAY-{i}",
+            contract_type=ContractType.BP_EMPLOYEE,
+            case=case,
+            contract_start_date=date(2024, 1, 1),
+            contract_end_date=date(2024, 12, 31),
+            standard_working_hours=STD_HOURS,
+            max_working_hours=max_h,
+            min_working_hours=min_h,
+            free_overtime_hours=5.0,
+            overtime_rate=OVERTIME_RATE,
+            shortage_rate=SHORTAGE_RATE,
+        )
+        await ContractCalculationItem.create(
+            contract=contract,
+            item_name="基本給",
+            item_type=ContractItemType.BASIC_SALARY,
+            amount=BASE_SALARY,
+            payment_unit=PaymentUnit.YEN_PER_MONTH,
+        )
+        contracts.append(contract)
+
+    for actual in ACTUAL_HOURS:
+        bulk = await Contract.calculate_monthly_payments_bulk(
+            [contract.id for contract in contracts], {contract.id: actual for contract in contracts}
+        )
+        for contract in contracts:
+            single = (await contract.calculate_monthly_payment(actual)).to_dict()
+            result = bulk[contract.id].to_dict()
+            for key in AMOUNT_KEYS:
+                assert result[key] == pytest.approx(single[key]), (contract.contract_number, actual, key)
+            assert result["calculation_details"] == single["calculation_details"]
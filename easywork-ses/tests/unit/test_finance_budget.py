@@ -0,0 +1,194 @@
+from datetime import date
+
+import pytest
+
+from app.models.enums import FinanceApprovalStatus, FinanceStatus, FinanceTransactionType
+from app.models.finance import FinanceBudget, FinanceTransaction
+
+CATEGORY = "交通費"
+
+
+async def create_budget(budget_amount: float = 1000.0, category: str = CATEGORY) -> FinanceBudget:
+    return await FinanceBudget.create(
+        budget_name=f"{category}予算",
+        category=category,
+        period_start=date(2024, 1, 1),
+        period_end=date(2024, 12, 31),
+        budget_amount=budget_amount,
+    )
+
+
+async def create_expense(number: str, amount: float, **kwargs) -> FinanceTransaction:
+    values = {
+        "transaction_type": FinanceTransactionType.EXPENSE,
+        "category": CATEGORY,
+        "payment_date": date(2024, 3, 1),
+        "status": FinanceStatus.COMPLETED,
+        "approval_status": FinanceApprovalStatus.APPROVED,
+    }
+    values.update(kwargs)
+    return await FinanceTransaction.create(
+        transaction_number=number, title=number, amount=amount, payment_method="cash", **values
+    )
+
+
+async def assert_budget(budget: FinanceBudget, spent: float):
+    """差分更新後の使用済み金額・残予算・使用率を確認し、再計算結果とも一致すること"""
+    await budget.refresh_from_db()
+    assert budget.spent_amount == pytest.approx(spent)
+    assert budget.remaining_amount == pytest.approx(budget.budget_amount - spent)
+    assert budget.usage_percentage == pytest.approx(spent / budget.budget_amount * 100)
+
+    await budget.update_spent_amount()
+    await budget.refresh_from_db()
+    assert budget.spent_amount == pytest.approx(spent)
+    assert budget.remaining_amount == pytest.approx(budget.budget_amount - spent)
+    assert budget.usage_percentage == pytest.approx(spent / budget.budget_amount * 100)
+
+
+@pytest.mark.asyncio
+async def test_budget_create_amend_resave(db):
+    """取引の作成・金額変更・再保存で予算の使用済み金額が差分更新されること"""
+    budget = await create_budget()
+
+    transaction = await create_expense("T-1", 300.0)
+    await assert_budget(budget, 300.0)
+
+    # 金額変更（全項目保存・update_fields指定の両方）
+    transaction.amount = 350.0
+    await transaction.save()
+    await assert_budget(budget, 350.0)
+    transaction.amount = 400.0
+    await transaction.save(update_fields=["amount", "updated_at"])
+    await assert_budget(budget, 400.0)
+
+    # 変更なしの再保存・予算に影響しない項目の保存では二重計上しない
+    await transaction.save()
+    transaction.title = "タイトル変更"
+    await transaction.save(update_fields=["title", "updated_at"])
+    await assert_budget(budget, 400.0)
+
+    # 期間外・別カテゴリへの変更で計上が外れる
+    transaction.payment_date = date(2025, 1, 10)
+    await transaction.save()
+    await assert_budget(budget, 0.0)
+    transaction.payment_date = date(2024, 6, 1)
+    transaction.category = "会議費"
+    await transaction.save()
+    await assert_budget(budget, 0.0)
+
+
+@pytest.mark.asyncio
+async def test_budget_counts_only_approved_completed_expenses(db):
+    """予算に計上されるのは承認済み・完了の支出のみで、差分更新と再計算が一致すること"""
+    budget = await create_budget()
+
+    await create_expense("T-1", 350.0)
+    await create_expense("T-2", 70.0, approval_status=FinanceApprovalStatus.PENDING)
+    await create_expense("T-3", 90.0, status=FinanceStatus.PENDING)
+    await create_expense("T-4", 500.0, transaction_type=FinanceTransactionType.INCOME)
+    await assert_budget(budget, 350.0)
+
+    # 承認で計上され、完了取消で計上が外れる
+    pending = await FinanceTransaction.get(transaction_number="T-2")
+    await pending.approve("承認者")
+    await assert_budget(budget, 420.0)
+
+    pending.status = FinanceStatus.PENDING
+    await pending.save()
+    await assert_budget(budget, 350.0)
+
+
+@pytest.mark.asyncio
+async def test_bulk_approve_applies_budget_delta(db):
+    """一括承認で新たに計上される取引のみ予算に反映されること"""
+    budget = await create_budget()
+
+    approved = await create_expense("T-1", 100.0)
+    first = await create_expense("T-2", 200.0, approval_status=FinanceApprovalStatus.PENDING)
+    second = await create_expense(
+        "T-3", 300.0, approval_status=FinanceApprovalStatus.PENDING, payment_date=date(2024, 5, 1)
+    )
+    incomplete = await create_expense(
+        "T-4", 400.0, approval_status=FinanceApprovalStatus.PENDING, status=FinanceStatus.PENDING
+    )
+    await assert_budget(budget, 100.0)
+
+    updated = await FinanceTransaction.bulk_approve([approved.id, first.id, second.id, incomplete.id], "承認者")
+
+    assert updated == 4
+    assert await FinanceTransaction.filter(approval_status=FinanceApprovalStatus.APPROVED).count() == 4
+    await assert_budget(budget, 600.0)
+
+
+@pytest.mark.asyncio
+async def test_budget_usage_percentage_thresholds(db):
+    """使用率が保存され、警告・アラート閾値超過の予算をDB側で抽出できること"""
+    budget = await create_budget()
+    empty_budget = await create_budget(budget_amount=0.0, category="会議費")
+
+    await create_expense("T-1", 850.0)
+    await assert_budget(budget, 850.0)
+    assert [b.id for b in await FinanceBudget.over_warning()] == [budget.id]
+    assert await FinanceBudget.over_alert().count() == 0
+
+    await create_expense("T-2", 150.0)
+    await assert_budget(budget, 1000.0)
+    assert [b.id for b in await FinanceBudget.over_alert()] == [budget.id]
+
+    # 予算金額0の予算は使用率0のまま
+    await create_expense("T-3", 100.0, category="会議費")
+    await empty_budget.refresh_from_db()
+    assert empty_budget.spent_amount == pytest.approx(100.0)
+    assert empty_budget.usage_percentage == 0.0
+
+
+@pytest.mark.asyncio
+async def test_budget_controller_create_and_update_recalculate(db):
+    """予算作成時は既存取引を集計し、更新時は差分更新済みの使用済み金額を上書きしないこと"""
+    from app.controllers.finance import FinanceController
+    from app.schemas.finance import FinanceBudgetCreate, FinanceBudgetUpdate
+
+    controller = FinanceController()
+    await create_expense("T-1", 300.0)
+
+    result = await controller.create_budget(
+        FinanceBudgetCreate(
+            budget_name="交通費予算",
+            category=CATEGORY,
+            period_start=date(2024, 1, 1),
+            period_end=date(2024, 12, 31),
+            budget_amount=1000.0,
+        )
+    )
+    budget = await FinanceBudget.get(id=result["budget"]["id"])
+    await assert_budget(budget, 300.0)
+
+    # 予算名のみの更新では使用済み金額を保持
+    await create_expense("T-2", 100.0)
+    await controller.update_budget(budget.id, FinanceBudgetUpdate(budget_name="変更後"))
+    await assert_budget(budget, 400.0)
+
+    # 予算金額の変更で残予算・使用率を再計算
+    result = await controller.update_budget(budget.id, FinanceBudgetUpdate(budget_amount=2000.0))
+    assert result["budget"]["remaining_amount"] == pytest.approx(1600.0)
+    assert result["budget"]["usage_percentage"] == pytest.approx(20.0)
+    await assert_budget(budget, 400.0)
+
+
+@pytest.mark.asyncio
+async def test_transaction_tax_columns_persisted_on_partial_save(db):
+    """金額・税率の部分更新でも税額・税抜金額が再計算されて保存されること"""
+    transaction = await create_expense("T-1", 1000.0, tax_rate=10.0)
+    await transaction.refresh_from_db()
+    assert (transaction.tax_amount, transaction.tax_exclusive_amount) == pytest.approx((100.0, 900.0))
+
+    transaction.amount = 2000.0
+    await transaction.save(update_fields=["amount", "updated_at"])
+    await transaction.refresh_from_db()
+    assert (transaction.tax_amount, transaction.tax_exclusive_amount) == pytest.approx((200.0, 1800.0))
+
+    transaction.tax_rate = 8.0
+    await transaction.save(update_fields=("tax_rate",))
+    await transaction.refresh_from_db()
+    assert (transaction.tax_amount, transaction.tax_exclusive_amount) == pytest.approx((160.0, 1840.0))
@@ -0,0 +1,88 @@
+from datetime import date
+
+import pytest
+
+from app.models.bp import BPCompany
+from app.models.case import Case
+from app.models.client import ClientCompany
+from app.models.contract import Contract, ContractCalculationItem
+from app.models.enums import ContractItemType, ContractType, OrderStatus, PaymentUnit, PersonType
+from app.models.order import Order
+from app.models.personnel import BPEmployeeDetail, Personnel
+
+
+async def create_order() -> Order:
+    client_company = await ClientCompany.create(company_name="注文書テスト顧客")
+    bp_company = await BPCompany.create(name="BP社")
+    sales_rep = await Personnel.create(name="営業担当", person_type=PersonType.EMPLOYEE)
+    personnel = await Personnel.create(name="山田太郎", person_type=PersonType.BP_EMPLOYEE)
+    await BPEmployeeDetail.create(personnel=personnel, bp_company=bp_company)
+    case = await Case.create(
+        title="注文書テスト案件", client_company=client_company, company_sales_representative=sales_rep
+    )
+    contract = await Contract.create(
+        contract_number="ORD-1",
+        contract_type=ContractType.BP_EMPLOYEE,
+        case=case,
+        personnel=personnel,
+        contract_start_date=date(2024, 1, 1),
+        contract_end_date=date(2024, 12, 31),
+    )
+    await ContractCalculationItem.create(
+        contract=contract,
+        item_name="基本給",
+        item_type=ContractItemType.BASIC_SALARY,
+        amount=500000,
+        payment_unit=PaymentUnit.YEN_PER_MONTH,
+    )
+    return await Order.create(
+        order_number="O-2024-06", year_month="2024-06", personnel=personnel, case=case, contract=contract
+    )
+
+
+@pytest.mark.asyncio
+async def test_mark_as_sent_takes_snapshot(db):
+    """送信時にBP会社・担当営業・基本給のスナップショットが保存されること"""
+    order = await create_order()
+    assert not order.has_snapshot
+
+    await order.mark_as_sent("送信者")
+
+    order = await Order.get(id=order.id)
+    bp_company = await BPCompany.get(name="BP社")
+    sales_rep = await Personnel.get(name="営業担当")
+    assert order.status == OrderStatus.SENT
+    assert order.has_snapshot
+    assert (order.bp_company_id, order.bp_company_name_snapshot) == (bp_company.id, "BP社")
+    assert (order.sales_representative_id, order.sales_representative_name_snapshot) == (sales_rep.id, "営業担当")
+    assert order.basic_salary_snapshot == pytest.approx(500000.0)
+
+
+@pytest.mark.asyncio
+async def test_sent_order_details_use_snapshot(db):
+    """送信後に関連データが変わっても、注文書詳細は送信時点のスナップショットを返すこと"""
+    order = await create_order()
+    await order.mark_as_sent("送信者")
+
+    await BPCompany.filter(name="BP社").update(name="BP社（変更後）")
+    await Personnel.filter(name="営業担当").update(name="別の営業")
+    await ContractCalculationItem.filter(contract_id=order.contract_id).update(amount=600000)
+
+    details = await (await Order.get(id=order.id)).get_full_details()
+    assert details["bp_company_name"] == "BP社"
+    assert details["sales_representative_name"] == "営業担当"
+    assert details["contract_details"]["basic_salary"] == pytest.approx(500000.0)
+    assert details["personnel_name"] == "山田太郎"
+
+    # 未送信の注文書は関連データの最新値を返す
+    draft = await Order.create(
+        order_number="O-2024-07",
+        year_month="2024-07",
+        personnel_id=order.personnel_id,
+        case_id=order.case_id,
+        contract_id=order.contract_id,
+    )
+    details = await draft.get_full_details()
+    assert details["bp_company_name"] == "BP社（変更後）"
+    assert details["sales_representative_name"] == "別の営業"
+    assert details["contract_details"]["basic_salary"] == pytest.approx(600000.0)
@@ -0,0 +1,68 @@
+from datetime import date
+
+import pytest
+
+from app.models.enums import PersonType
+from app.models.evaluation import PersonEvaluation
+from app.models.personnel import Personnel
+
+
+async def create_evaluation(**kwargs) -> PersonEvaluation:
+    return await PersonEvaluation.create(
+        person_type=PersonType.FREELANCER,
+        technical_skill=4,
+        communication=4,
+        reliability=5,
+        proactiveness=3,
+        overall_rating=4,
+        recommendation=True,
+        evaluator_id=1,
+        evaluation_date=date(2024, 3, 31),
+        **kwargs,
+    )
+
+
+@pytest.mark.asyncio
+async def test_evaluation_person_id_synced_with_personnel(db):
+    """外部キー（personnel）と旧参照（person_id）がどちらの指定でも同期されること"""
+    personnel = await Personnel.create(name="山田太郎", person_type=PersonType.FREELANCER)
+    other = await Personnel.create(name="佐藤花子", person_type=PersonType.FREELANCER)
+
+    by_personnel = await create_evaluation(personnel=personnel)
+    assert by_personnel.person_id == personnel.id
+
+    by_person_id = await create_evaluation(person_id=personnel.id)
+    assert by_person_id.personnel_id == personnel.id
+
+    # person_id の変更は外部キーに反映される（全項目保存・update_fields指定とも）
+    evaluation = await PersonEvaluation.get(id=by_person_id.id)
+    evaluation.person_id = other.id
+    await evaluation.save()
+    await evaluation.refresh_from_db()
+    assert evaluation.personnel_id == other.id
+
+    evaluation.person_id = personnel.id
+    await evaluation.save(update_fields=["person_id", "updated_at"])
+    await evaluation.refresh_from_db()
+    assert evaluation.personnel_id == personnel.id
+
+
+@pytest.mark.asyncio
+async def test_evaluation_survives_personnel_delete(db):
+    """人材を削除しても評価は残り、外部キーのみNULLになること（再保存でも復元しない）"""
+    personnel = await Personnel.create(name="山田太郎", person_type=PersonType.FREELANCER)
+    evaluation = await create_evaluation(personnel=personnel)
+
+    await personnel.delete()
+
+    evaluation = await PersonEvaluation.with_related().get(id=evaluation.id)
+    assert evaluation.personnel_id is None
+    assert (evaluation.person_type, evaluation.person_id) == (PersonType.FREELANCER, personnel.id)
+    assert evaluation.person_name == f"FREELANCER-{personnel.id}"
+    assert await evaluation.get_person_object() is None
+
+    evaluation.remark = "人材削除後の追記"
+    await evaluation.save()
+    await evaluation.refresh_from_db()
+    assert evaluation.personnel_id is None
+    assert evaluation.person_id == personnel.id